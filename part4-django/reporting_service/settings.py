@@ -39,6 +39,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'reports.middleware.ReportAdmissionMiddleware',
+    'reports.middleware.ReportProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -131,3 +133,39 @@ REST_FRAMEWORK = {
 # Node.js API Configuration
 NODE_API_BASE_URL = os.getenv('NODE_API_BASE_URL', 'http://localhost:3000/api')
 
+# Report corpus cache: seconds the fetched videos and derived aggregates are reused
+REPORT_CORPUS_CACHE_TTL = int(os.getenv('REPORT_CORPUS_CACHE_TTL', '300'))
+
+# Bulk export: rows per streamed chunk / Parquet row group
+REPORT_EXPORT_BATCH_SIZE = int(os.getenv('REPORT_EXPORT_BATCH_SIZE', '1000'))
+
+# Parallel aggregation: worker processes that fetch and aggregate page ranges
+# themselves (0 or 1 disables them), pages per worker task, and the corpus size
+# in pages below which aggregation stays in the request process
+REPORT_AGGREGATION_WORKERS = int(os.getenv('REPORT_AGGREGATION_WORKERS', '0'))
+REPORT_AGGREGATION_PAGES_PER_TASK = int(os.getenv('REPORT_AGGREGATION_PAGES_PER_TASK', '5'))
+REPORT_AGGREGATION_MIN_PAGES = int(os.getenv('REPORT_AGGREGATION_MIN_PAGES', '20'))
+
+# Async report jobs: worker threads per process, and the age (seconds) after
+# which a job still pending or running is treated as abandoned
+REPORT_JOB_WORKERS = int(os.getenv('REPORT_JOB_WORKERS', '2'))
+REPORT_JOB_STALE_AFTER = int(os.getenv('REPORT_JOB_STALE_AFTER', '3600'))
+
+# On-demand request profiling: disabled unless a token is set. Callers send it
+# in the X-Report-Profile header to capture one request; allowed IPs, when set,
+# further restrict who may use it.
+REPORT_PROFILING_TOKEN = os.getenv('REPORT_PROFILING_TOKEN', '')
+REPORT_PROFILING_ALLOWED_IPS = [ip for ip in os.getenv('REPORT_PROFILING_ALLOWED_IPS', '').split(',') if ip]
+REPORT_PROFILE_DIR = os.getenv('REPORT_PROFILE_DIR', str(BASE_DIR / 'profiles'))
+REPORT_PROFILE_MAX_FILES = int(os.getenv('REPORT_PROFILE_MAX_FILES', '20'))
+
+# Admission control for /api/report/ (per process): concurrent upstream-bound
+# requests per endpoint, how many may wait and for how long (seconds), and the
+# Retry-After sent when shedding. REPORT_ADMISSION_LIMITS overrides per endpoint,
+# e.g. {'export': {'max_concurrency': 1}}.
+REPORT_ADMISSION_ENABLED = os.getenv('REPORT_ADMISSION_ENABLED', 'True') == 'True'
+REPORT_ADMISSION_MAX_CONCURRENCY = int(os.getenv('REPORT_ADMISSION_MAX_CONCURRENCY', '4'))
+REPORT_ADMISSION_MAX_QUEUE = int(os.getenv('REPORT_ADMISSION_MAX_QUEUE', '16'))
+REPORT_ADMISSION_QUEUE_TIMEOUT = float(os.getenv('REPORT_ADMISSION_QUEUE_TIMEOUT', '10'))
+REPORT_ADMISSION_RETRY_AFTER = int(os.getenv('REPORT_ADMISSION_RETRY_AFTER', '5'))
+REPORT_ADMISSION_LIMITS = {}
@@ -0,0 +1,35 @@
+"""
+API-only Django settings for reporting_service project.
+
+The service only serves JSON, so this profile drops the admin, sessions,
+messages, CSRF and the template engine to cut cold-start time. Select it with
+DJANGO_SETTINGS_MODULE=reporting_service.settings_api.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import REST_FRAMEWORK
+
+
+INSTALLED_APPS = [
+    'rest_framework',
+    'reports',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'reports.middleware.ReportAdmissionMiddleware',
+    'reports.middleware.ReportProfilingMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+TEMPLATES = []
+
+AUTH_PASSWORD_VALIDATORS = []
+
+# No django.contrib.auth: requests are anonymous and DRF must not touch users
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': [],
+    'UNAUTHENTICATED_USER': None,
+}
@@ -1,11 +1,15 @@
 """
 URL configuration for reporting_service project.
 """
-from django.contrib import admin
+from django.apps import apps
 from django.urls import path, include
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('api/report/', include('reports.urls')),
 ]
 
+# The API-only settings profile leaves the admin out
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
@@ -0,0 +1,148 @@
+import json
+import multiprocessing
+import random
+import statistics
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from django.core.management.base import BaseCommand, CommandError
+from reports.services.aggregation import AggregationEngine, aggregate_chunk, get_aggregation_pool, shutdown_aggregation_pool
+from reports.services.node_api_client import NodeApiClient
+
+
+CATEGORIES = ['Education', 'Technology', 'Music', 'Sports', 'Gaming', 'Travel', 'Cooking', 'News']
+
+
+def _build_pages(video_count: int, users: int, page_size: int):
+    """Synthetic corpus shaped like the Node.js API, pre-encoded page by page"""
+    rng = random.Random(42)
+    videos = []
+    for video_id in range(1, video_count + 1):
+        user_id = rng.randint(1, users)
+        videos.append({
+            'id': video_id,
+            'title': f'Video {video_id} about {rng.choice(CATEGORIES).lower()}',
+            'description': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 2,
+            'category': rng.choice(CATEGORIES),
+            'duration': rng.randint(30, 3600),
+            'userId': user_id,
+            'user': {'id': user_id, 'name': f'User {user_id}', 'email': f'user{user_id}@example.com'},
+            'createdAt': '2024-01-01T00:00:00.000Z',
+            'updatedAt': '2024-01-01T00:00:00.000Z',
+        })
+
+    total_pages = max(1, -(-video_count // page_size))
+    return [
+        json.dumps({
+            'videos': videos[(page - 1) * page_size:page * page_size],
+            'pagination': {'page': page, 'limit': page_size, 'total': video_count, 'totalPages': total_pages},
+        }).encode()
+        for page in range(1, total_pages + 1)
+    ]
+
+
+def _serve_videos(ready, video_count: int, users: int, page_size: int, latency: float):
+    """Stand-in for the Node.js API's /videos endpoint, run in its own process"""
+    pages = _build_pages(video_count, users, page_size)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            page = int(parse_qs(url.query).get('page', ['1'])[0])
+            # Simulated network round trip and database time upstream
+            time.sleep(latency)
+            body = pages[page - 1] if url.path.endswith('/videos') and 1 <= page <= len(pages) else b'{}'
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark corpus aggregation: serial fetch-then-aggregate vs page-split worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--videos', type=int, default=200000, help='Corpus size (default: 200000)')
+        parser.add_argument('--users', type=int, default=5000, help='Distinct video owners (default: 5000)')
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.05,
+            help='Simulated upstream latency per page request, in seconds (default: 0.05)',
+        )
+        parser.add_argument('--workers', type=int, default=4, help='Aggregation worker processes (default: 4)')
+        parser.add_argument(
+            '--pages-per-task',
+            type=int,
+            default=5,
+            help='Pages fetched by each worker task (default: 5)',
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=3,
+            help='Runs per strategy; the median is reported (default: 3)',
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] < 2:
+            raise CommandError('--workers must be at least 2')
+
+        ctx = multiprocessing.get_context('spawn')
+        ready = ctx.Queue()
+        server = ctx.Process(
+            target=_serve_videos,
+            args=(ready, options['videos'], options['users'], NodeApiClient.VIDEO_PAGE_SIZE, options['latency']),
+            daemon=True,
+        )
+        server.start()
+        try:
+            port = ready.get(timeout=120)
+            client = NodeApiClient()
+            client.base_url = f'http://127.0.0.1:{port}/api'
+            engine = AggregationEngine(
+                workers=options['workers'],
+                pages_per_task=options['pages_per_task'],
+                min_parallel_pages=0,
+            )
+
+            # The pool is long-lived, so start it up front and time steady state
+            started = time.perf_counter()
+            pool = get_aggregation_pool(options['workers'])
+            list(pool.map(abs, range(options['workers'])))
+            pool_start = time.perf_counter() - started
+
+            serial_times, parallel_times = [], []
+            for _ in range(options['runs']):
+                started = time.perf_counter()
+                serial = aggregate_chunk(client.get_videos())
+                serial_times.append(time.perf_counter() - started)
+
+                started = time.perf_counter()
+                parallel = engine.aggregate_corpus(client)
+                parallel_times.append(time.perf_counter() - started)
+
+                if parallel != serial:
+                    raise CommandError('Parallel aggregates differ from the serial result')
+        finally:
+            shutdown_aggregation_pool()
+            server.terminate()
+
+        serial_s = statistics.median(serial_times)
+        parallel_s = statistics.median(parallel_times)
+        self.stdout.write(f"Corpus:            {options['videos']} videos, "
+                          f"{-(-options['videos'] // NodeApiClient.VIDEO_PAGE_SIZE)} pages, "
+                          f"{options['latency'] * 1000:.0f} ms upstream latency per page")
+        self.stdout.write(f"Serial:            {serial_s:.2f} s (fetch all pages, then aggregate)")
+        self.stdout.write(f"Parallel:          {parallel_s:.2f} s ({options['workers']} workers, "
+                          f"{options['pages_per_task']} pages per task)")
+        self.stdout.write(f"Speedup:           {serial_s / parallel_s:.2f}x (median of {options['runs']})")
+        self.stdout.write(f"Pool start (once): {pool_start:.2f} s")
@@ -0,0 +1,55 @@
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from reports.services.export_service import ExportService
+
+
+class Command(BaseCommand):
+    help = 'Export the video corpus and per-user aggregates as CSV, NDJSON, Parquet or Arrow files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dataset',
+            choices=ExportService.DATASETS + ('all',),
+            default='all',
+            help='Dataset to export (default: all)',
+        )
+        parser.add_argument(
+            '--format',
+            dest='file_format',
+            choices=ExportService.FORMATS,
+            default='csv',
+            help='Output format (default: csv)',
+        )
+        parser.add_argument(
+            '--output-dir',
+            default='.',
+            help='Directory the export files are written to (default: current directory)',
+        )
+        parser.add_argument('--category', help='Only export videos in this category')
+        parser.add_argument('--search', help='Only export videos whose title or description matches')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Rows per chunk / row group (default: REPORT_EXPORT_BATCH_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        file_format = options['file_format']
+        datasets = ExportService.DATASETS if options['dataset'] == 'all' else (options['dataset'],)
+        output_dir = Path(options['output_dir'])
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        export_service = ExportService(batch_size=options['batch_size'])
+        for dataset in datasets:
+            path = output_dir / f'{dataset}.{file_format}'
+            try:
+                rows = export_service.write_file(
+                    dataset,
+                    file_format,
+                    str(path),
+                    category=options['category'],
+                    search=options['search'],
+                )
+            except Exception as e:
+                raise CommandError(f"Failed to export {dataset}: {str(e)}")
+            self.stdout.write(self.style.SUCCESS(f'Exported {rows} {dataset} rows to {path}'))
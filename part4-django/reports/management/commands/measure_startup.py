@@ -0,0 +1,91 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Runs in a fresh interpreter so every measurement is a cold start
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+imported = time.perf_counter()
+
+from wsgiref.util import setup_testing_defaults
+environ = {'PATH_INFO': sys.argv[1], 'SERVER_NAME': 'localhost'}
+setup_testing_defaults(environ)
+statuses = []
+response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+b''.join(response)
+done = time.perf_counter()
+
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'first_request_ms': (done - imported) * 1000,
+    'status': statuses[0],
+    'modules': len(sys.modules),
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Measure cold-start import time and time to first request in fresh processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            default='/api/report/',
+            help='Path requested as the first request (default: /api/report/)',
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=5,
+            help='Number of cold starts to measure; the median is reported (default: 5)',
+        )
+        parser.add_argument('--json', action='store_true', help='Print the result as JSON')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+        samples = []
+        for _ in range(options['runs']):
+            started = time.perf_counter()
+            completed = subprocess.run(
+                [sys.executable, '-c', PROBE, options['url']],
+                capture_output=True,
+                text=True,
+                env=env,
+                cwd=settings.BASE_DIR,
+            )
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if completed.returncode != 0:
+                raise CommandError(f"Startup probe failed:\n{completed.stderr}")
+            sample = json.loads(completed.stdout.strip().splitlines()[-1])
+            sample['process_ms'] = elapsed_ms
+            samples.append(sample)
+
+        result = {
+            'settings': settings.SETTINGS_MODULE,
+            'url': options['url'],
+            'runs': len(samples),
+            'status': samples[-1]['status'],
+            'modules': samples[-1]['modules'],
+        }
+        for key in ('import_ms', 'first_request_ms', 'process_ms'):
+            result[key] = round(statistics.median(sample[key] for sample in samples), 1)
+
+        if options['json']:
+            self.stdout.write(json.dumps(result))
+            return
+
+        self.stdout.write(f"Settings:          {result['settings']}")
+        self.stdout.write(f"First request:     GET {result['url']} -> {result['status']}")
+        self.stdout.write(f"Import time:       {result['import_ms']} ms")
+        self.stdout.write(f"Time to first req: {result['first_request_ms']} ms")
+        self.stdout.write(f"Process total:     {result['process_ms']} ms (median of {result['runs']})")
+        self.stdout.write(f"Modules loaded:    {result['modules']}")
@@ -0,0 +1,164 @@
+import cProfile
+from functools import partial
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+from .services.admission import AdmissionSlot, admission_controller
+from .services.profiling import ProfileStore, is_profiling_allowed, wants_profile
+from .services.report_service import ReportService
+
+
+class ClosingContent:
+    """Streamed response body that calls `on_close` when the response is closed
+
+    Django and WSGI servers close every response, whether or not its body was
+    iterated (HEAD requests, disconnected clients), unlike a generator's
+    `finally`, which only runs once iteration has started.
+    """
+
+    def __init__(self, content, on_close):
+        self.content = content
+        self.on_close = on_close
+
+    def __iter__(self):
+        return iter(self.content)
+
+    def close(self):
+        self.on_close()
+
+
+class ReportAdmissionMiddleware:
+    """Admission control and load shedding for report endpoints
+
+    Requests that need an upstream fetch from the Node.js API are limited per
+    endpoint (summary, user, leaderboard, export) with a bounded wait queue;
+    once the queue is full they get 503 with Retry-After. Requests that can be
+    answered without the upstream - everything this report needs is cached, or
+    the endpoint never fetches (jobs, profiles, metrics) - skip the queue, and
+    queued requests leave it as soon as their data becomes cached. Limiters are keyed by the
+    resolved route, so path parameters and unknown paths never add limiters.
+    """
+
+    # Route names (url_name) of endpoints that fetch upstream, mapped to their
+    # limiter. Anything else (jobs, profiles, metrics, unknown paths) is not limited.
+    LIMITED_ROUTES = {
+        'report-summary': 'summary',
+        'report-user': 'user',
+        'report-user-activity': 'user',  # Router route <pk>/user/
+        'report-leaderboard': 'leaderboard',
+        'report-export': 'export',
+    }
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REPORT_ADMISSION_ENABLED', True):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            self._release(request)
+            raise
+
+        slot = getattr(request, '_admission_slot', None)
+        if slot is not None and response.streaming:
+            # Streamed exports keep fetching upstream while the body is read, so
+            # the slot is held until the response is closed - read fully or not
+            response.streaming_content = ClosingContent(response.streaming_content, slot.release)
+            request._admission_slot = None
+        else:
+            self._release(request)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        endpoint = self.LIMITED_ROUTES.get(request.resolver_match.url_name)
+        if endpoint is None:
+            return None
+        is_cached = partial(ReportService.is_report_cached, endpoint, request.GET)
+        if is_cached():
+            admission_controller.record_fast_lane()
+            return None
+
+        limiter = admission_controller.get_limiter(endpoint)
+        admitted = limiter.acquire(bypass=is_cached)
+        if admitted is False:
+            response = JsonResponse(
+                {'error': 'Report service is overloaded, please retry later'},
+                status=503
+            )
+            response['Retry-After'] = str(getattr(settings, 'REPORT_ADMISSION_RETRY_AFTER', 5))
+            return response
+        if admitted is None:
+            admission_controller.record_fast_lane()
+            return None
+
+        request._admission_slot = AdmissionSlot(limiter)
+        return None
+
+    def _release(self, request):
+        slot = getattr(request, '_admission_slot', None)
+        if slot is not None:
+            request._admission_slot = None
+            slot.release()
+
+
+class ReportProfilingMiddleware:
+    """Capture a cProfile of a single report request on demand
+
+    A request is profiled when it carries the profiling token in the
+    `X-Report-Profile` header (from an address in REPORT_PROFILING_ALLOWED_IPS,
+    if set). Without REPORT_PROFILING_TOKEN configured the middleware removes
+    itself from the stack, so it costs nothing when disabled.
+    """
+
+    PROFILED_PREFIX = '/api/report/'
+    EXCLUDED_PREFIX = '/api/report/profiles/'
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REPORT_PROFILING_TOKEN', ''):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.store = ProfileStore()
+
+    def __call__(self, request):
+        if not self._wants_profile(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+
+        if not response.streaming:
+            response['X-Report-Profile-Id'] = self.store.save(profiler, request.path)
+            return response
+
+        # Streamed exports fetch and serialize while the body is read, so keep
+        # profiling during iteration and save once the response is closed
+        name = self.store.new_name(request.path)
+        response['X-Report-Profile-Id'] = name
+        response.streaming_content = ClosingContent(
+            self._profile_iteration(response.streaming_content, profiler),
+            partial(self.store.save, profiler, request.path, name),
+        )
+        return response
+
+    def _profile_iteration(self, content, profiler):
+        iterator = iter(content)
+        while True:
+            profiler.enable()
+            try:
+                chunk = next(iterator, None)
+            finally:
+                profiler.disable()
+            if chunk is None:
+                return
+            yield chunk
+
+    def _wants_profile(self, request) -> bool:
+        if not request.path.startswith(self.PROFILED_PREFIX) or request.path.startswith(self.EXCLUDED_PREFIX):
+            return False
+        return wants_profile(request) and is_profiling_allowed(request)
@@ -0,0 +1,47 @@
+import uuid
+from django.db import models
+from django.db.models import Q
+
+
+class ReportJob(models.Model):
+    """A report computed in the background and polled for by the client"""
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    ACTIVE_STATUSES = (STATUS_PENDING, STATUS_RUNNING)
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    report_type = models.CharField(max_length=32)
+    params = models.JSONField(default=dict)
+    # Hash of report_type + params, shared by identical requests
+    dedupe_key = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    # Process that dispatched or is running the job ("<host>:<pid>")
+    worker = models.CharField(max_length=128, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            # At most one active job per identical request, across processes
+            models.UniqueConstraint(
+                fields=['dedupe_key'],
+                condition=Q(status__in=['pending', 'running']),
+                name='unique_active_report_job',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.report_type} job {self.id} ({self.status})'
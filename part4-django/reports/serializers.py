@@ -15,6 +15,7 @@ class SummaryReportSerializer(serializers.Serializer):
         child=CategoryCountSerializer()
     )
     categories_count = serializers.IntegerField()
+    filters = serializers.DictField()
 
 
 class UserSerializer(serializers.Serializer):
@@ -33,3 +34,34 @@ class UserActivityReportSerializer(serializers.Serializer):
     total_duration_formatted = serializers.CharField()
     videos = serializers.ListField()
 
+
+class LeaderboardEntrySerializer(serializers.Serializer):
+    """Serializer for a single leaderboard entry"""
+    rank = serializers.IntegerField()
+    user = UserSerializer()
+    total_videos = serializers.IntegerField()
+    total_duration_seconds = serializers.IntegerField()
+    total_duration_formatted = serializers.CharField()
+
+
+class LeaderboardReportSerializer(serializers.Serializer):
+    """Serializer for top-N users leaderboard report"""
+    metric = serializers.CharField()
+    category = serializers.CharField(allow_null=True)
+    total_users = serializers.IntegerField()
+    leaders = serializers.ListField(
+        child=LeaderboardEntrySerializer()
+    )
+
+
+class ReportJobSerializer(serializers.Serializer):
+    """Serializer for an async report job"""
+    id = serializers.UUIDField()
+    report_type = serializers.CharField()
+    params = serializers.DictField()
+    status = serializers.CharField()
+    result = serializers.JSONField(allow_null=True)
+    error = serializers.CharField(allow_blank=True)
+    created_at = serializers.DateTimeField()
+    started_at = serializers.DateTimeField(allow_null=True)
+    finished_at = serializers.DateTimeField(allow_null=True)
@@ -0,0 +1,154 @@
+import threading
+import time
+from typing import Callable, Dict, Optional
+from django.conf import settings
+
+
+class AdmissionLimiter:
+    """Concurrency limit with a bounded wait queue for one endpoint"""
+
+    # How often queued requests re-check `bypass()`: the corpus may be cached by
+    # a request on another endpoint, which never notifies this limiter
+    BYPASS_POLL_INTERVAL = 0.05
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.bypassed = 0
+        self.shed = 0
+        self.timed_out = 0
+
+    def acquire(self, bypass: Optional[Callable[[], bool]] = None) -> Optional[bool]:
+        """Wait for a slot
+
+        Returns True when a slot was taken (call release() afterwards), None
+        when `bypass()` became true while queued (e.g. the data got cached, so
+        no slot is needed), and False when the request should be shed.
+        """
+        with self._cond:
+            if self.in_flight < self.max_concurrency and not self.queued:
+                self.in_flight += 1
+                self.admitted += 1
+                return True
+            if self.queued >= self.max_queue:
+                self.shed += 1
+                return False
+
+            self.queued += 1
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self.in_flight >= self.max_concurrency:
+                    if bypass and bypass():
+                        self.bypassed += 1
+                        return None
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timed_out += 1
+                        self.shed += 1
+                        return False
+                    self._cond.wait(min(remaining, self.BYPASS_POLL_INTERVAL) if bypass else remaining)
+                self.in_flight += 1
+                self.admitted += 1
+                return True
+            finally:
+                self.queued -= 1
+
+    def release(self):
+        with self._cond:
+            self.in_flight = max(self.in_flight - 1, 0)
+            # Wake every waiter: some may now be servable from cache without a slot
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict:
+        with self._cond:
+            return {
+                'max_concurrency': self.max_concurrency,
+                'max_queue': self.max_queue,
+                'in_flight': self.in_flight,
+                'queue_depth': self.queued,
+                'admitted': self.admitted,
+                'bypassed': self.bypassed,
+                'shed': self.shed,
+                'timed_out': self.timed_out,
+            }
+
+
+class AdmissionSlot:
+    """A slot taken from a limiter; release() gives it back at most once
+
+    Streamed responses may be released from more than one place (the close
+    path, error handling), so a repeated release must not free another
+    request's slot.
+    """
+
+    def __init__(self, limiter: AdmissionLimiter):
+        self.limiter = limiter
+        self._lock = threading.Lock()
+        self._released = False
+
+    def release(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self.limiter.release()
+
+
+class AdmissionController:
+    """Per-endpoint admission limiters plus the fast lane for cached requests
+
+    Limits come from REPORT_ADMISSION_* settings, with per-endpoint overrides in
+    REPORT_ADMISSION_LIMITS, e.g. {'export': {'max_concurrency': 1}}.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._limiters: Dict[str, AdmissionLimiter] = {}
+        self.fast_lane_admitted = 0
+
+    def get_limiter(self, endpoint: str) -> AdmissionLimiter:
+        with self._lock:
+            limiter = self._limiters.get(endpoint)
+            if limiter is None:
+                overrides = getattr(settings, 'REPORT_ADMISSION_LIMITS', {}).get(endpoint, {})
+                limiter = self._limiters[endpoint] = AdmissionLimiter(
+                    max_concurrency=overrides.get(
+                        'max_concurrency', getattr(settings, 'REPORT_ADMISSION_MAX_CONCURRENCY', 4)
+                    ),
+                    max_queue=overrides.get(
+                        'max_queue', getattr(settings, 'REPORT_ADMISSION_MAX_QUEUE', 16)
+                    ),
+                    queue_timeout=overrides.get(
+                        'queue_timeout', getattr(settings, 'REPORT_ADMISSION_QUEUE_TIMEOUT', 10)
+                    ),
+                )
+            return limiter
+
+    def record_fast_lane(self):
+        with self._lock:
+            self.fast_lane_admitted += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            limiters = dict(self._limiters)
+            fast_lane_admitted = self.fast_lane_admitted
+        return {
+            'endpoints': {name: limiter.snapshot() for name, limiter in sorted(limiters.items())},
+            'fast_lane_admitted': fast_lane_admitted,
+            'shed_total': sum(limiter.shed for limiter in limiters.values()),
+        }
+
+    def reset(self):
+        """Drop all limiters and counters (limits are re-read from settings)"""
+        with self._lock:
+            self._limiters = {}
+            self.fast_lane_admitted = 0
+
+
+# Shared by every request in this process
+admission_controller = AdmissionController()
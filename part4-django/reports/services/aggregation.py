@@ -0,0 +1,174 @@
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+from django.conf import settings
+from .node_api_client import NodeApiClient
+from .query_planner import category_key, get_video_user_id
+
+
+def aggregate_chunk(videos: List[Dict], category: Optional[str] = None,
+                    partial: Optional[Dict] = None) -> Dict:
+    """Map step: per-category counts and per-user totals for one chunk of videos
+
+    Pass `partial` from a previous call to keep adding to it, e.g. when the
+    corpus arrives page by page. Module-level so it can run in worker processes.
+    """
+    if partial is None:
+        partial = {'total_videos': 0, 'category_counts': Counter(), 'users': {}}
+    category_counts = partial['category_counts']
+    users = partial['users']
+    category_filter = category_key(category) if category else None
+
+    for video in videos:
+        video_category = video.get('category', 'Unknown')
+        if category_filter and category_key(video_category) != category_filter:
+            continue
+        partial['total_videos'] += 1
+        category_counts[video_category] += 1
+
+        user_id = get_video_user_id(video)
+        if not user_id:
+            continue
+
+        acc = users.get(user_id)
+        if acc is None:
+            user_obj = video.get('user')
+            if not isinstance(user_obj, dict):
+                user_obj = {}
+            acc = users[user_id] = {
+                'user': {
+                    'id': user_id,
+                    'name': user_obj.get('name', 'Unknown User'),
+                    'email': user_obj.get('email', 'N/A'),
+                },
+                'total_videos': 0,
+                'total_duration_seconds': 0,
+            }
+        acc['total_videos'] += 1
+        acc['total_duration_seconds'] += video.get('duration', 0) or 0
+
+    return partial
+
+
+def merge_partials(partials: Iterable[Dict]) -> Dict:
+    """Reduce step: merge partial aggregates in corpus order
+
+    Merging in order keeps first-seen user info and Counter tie order exactly
+    as a single serial pass would produce them.
+    """
+    merged = {'total_videos': 0, 'category_counts': Counter(), 'users': {}}
+    users = merged['users']
+
+    for partial in partials:
+        merged['total_videos'] += partial['total_videos']
+        merged['category_counts'].update(partial['category_counts'])
+        for user_id, acc in partial['users'].items():
+            existing = users.get(user_id)
+            if existing is None:
+                users[user_id] = acc
+            else:
+                existing['total_videos'] += acc['total_videos']
+                existing['total_duration_seconds'] += acc['total_duration_seconds']
+
+    return merged
+
+
+def aggregate_pages(base_url: str, pages: Iterable[int], category: Optional[str] = None) -> Dict:
+    """Worker task: fetch a range of video pages and aggregate them
+
+    The worker fetches its own pages, so only the page numbers go in and only
+    the (small) partial aggregate comes back; no videos cross processes.
+    """
+    client = NodeApiClient()
+    client.base_url = base_url
+    partial = aggregate_chunk([], category)
+    for page in pages:
+        aggregate_chunk(client.get_video_page(page, category=category).get('videos', []), category, partial)
+    return partial
+
+
+def _init_worker():
+    # Spawned workers start from a bare interpreter
+    import django
+    django.setup()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_aggregation_pool(workers: int):
+    """Process-wide aggregation pool, created on first use and kept for reuse
+
+    Workers are spawned rather than forked: this is called from a threaded
+    server, and forking a process with other threads running is unsafe.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Imported here to keep multiprocessing off the startup path
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+            )
+        return _pool
+
+
+def shutdown_aggregation_pool():
+    """Stop the aggregation workers; the next parallel run starts a new pool"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+class AggregationEngine:
+    """Computes corpus aggregates straight from the Node.js API, split by page
+
+    With more than one worker, the pages after the first are split into ranges
+    that worker processes fetch and aggregate themselves, so fetching, JSON
+    decoding and counting all run in parallel and only partial aggregates are
+    sent back. Corpora of fewer than `min_parallel_pages` pages are fetched
+    and aggregated in this process. Both paths produce identical results.
+    """
+
+    def __init__(self, workers: Optional[int] = None, pages_per_task: Optional[int] = None,
+                 min_parallel_pages: Optional[int] = None):
+        self.workers = workers if workers is not None else getattr(settings, 'REPORT_AGGREGATION_WORKERS', 0)
+        self.pages_per_task = pages_per_task or getattr(settings, 'REPORT_AGGREGATION_PAGES_PER_TASK', 5)
+        self.min_parallel_pages = min_parallel_pages if min_parallel_pages is not None else (
+            getattr(settings, 'REPORT_AGGREGATION_MIN_PAGES', 20)
+        )
+
+    @property
+    def parallel(self) -> bool:
+        """Whether worker processes are enabled"""
+        return self.workers > 1
+
+    def aggregate_corpus(self, api_client, category: Optional[str] = None) -> Dict:
+        """Fetch the whole corpus page by page and aggregate it
+
+        A `category` is pushed down to the Node.js API, so only that category's
+        pages are transferred.
+        """
+        # The first page tells us how many pages there are
+        first_page = api_client.get_video_page(1, category=category)
+        partial = aggregate_chunk(first_page.get('videos', []), category)
+        pages = range(2, first_page.get('pagination', {}).get('totalPages', 1) + 1)
+
+        if not self.parallel or len(pages) < self.min_parallel_pages:
+            for page in pages:
+                aggregate_chunk(api_client.get_video_page(page, category=category).get('videos', []), category, partial)
+            return partial
+
+        pool = get_aggregation_pool(self.workers)
+        futures = [
+            pool.submit(aggregate_pages, api_client.base_url, pages[start:start + self.pages_per_task], category)
+            for start in range(0, len(pages), self.pages_per_task)
+        ]
+        # Merge in page order, which merge_partials relies on
+        return merge_partials([partial] + [future.result() for future in futures])
@@ -0,0 +1,105 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from django.conf import settings
+
+
+class CorpusCache:
+    """Process-local cache for the video corpus and aggregates derived from it
+
+    Derived values (per-user accumulators, indexes, ...) are stored next to
+    the corpus they were computed from and are dropped together with it, so
+    they can never outlive the data they describe.
+    """
+
+    def __init__(self, ttl: Optional[int] = None):
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._videos: Optional[List[Dict]] = None
+        self._loaded_at = 0.0
+        self._derived: Dict[Any, Any] = {}
+        self._standalone: Dict[Any, Any] = {}
+        self._build_locks: Dict[Any, threading.Lock] = {}
+
+    def _get_ttl(self) -> int:
+        """TTL in seconds, read from settings unless given explicitly"""
+        if self.ttl is not None:
+            return self.ttl
+        return getattr(settings, 'REPORT_CORPUS_CACHE_TTL', 300)
+
+    def is_fresh(self) -> bool:
+        """Whether a corpus is cached and has not expired"""
+        return (
+            self._videos is not None
+            and time.monotonic() - self._loaded_at < self._get_ttl()
+        )
+
+    def get_videos(self, loader: Callable[[], List[Dict]]) -> List[Dict]:
+        """Return the cached corpus, calling `loader` to (re)load it when stale"""
+        with self._lock:
+            if not self.is_fresh():
+                self._videos = loader()
+                self._loaded_at = time.monotonic()
+                self._derived = {}
+            return self._videos
+
+    def get_derived(self, key: Any, builder: Callable[[List[Dict]], Any],
+                    loader: Callable[[], List[Dict]]) -> Any:
+        """Return a value computed from the corpus, building it once per corpus load"""
+        with self._lock:
+            videos = self.get_videos(loader)
+            if key not in self._derived:
+                self._derived[key] = builder(videos)
+            return self._derived[key]
+
+    def has_standalone(self, key: Any) -> bool:
+        """Whether a standalone value is cached and has not expired"""
+        with self._lock:
+            entry = self._standalone.get(key)
+            return entry is not None and time.monotonic() - entry[0] < self._get_ttl()
+
+    def get_standalone(self, key: Any, builder: Callable[[], Any]) -> Any:
+        """Return a value built straight from the Node.js API, cached for the TTL
+
+        For values that never need the corpus in this process (e.g. aggregates
+        computed by worker processes). The build runs outside the cache lock,
+        so a slow build does not block other cache readers, but under a lock of
+        its own key, so concurrent requests for it share a single build.
+        """
+        with self._lock:
+            if self.has_standalone(key):
+                return self._standalone[key][1]
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        with build_lock:
+            with self._lock:
+                # Built by the request we waited for
+                if self.has_standalone(key):
+                    return self._standalone[key][1]
+            try:
+                value = builder()
+                with self._lock:
+                    now = time.monotonic()
+                    # Drop expired entries so per-filter keys do not pile up
+                    self._standalone = {
+                        cached_key: entry for cached_key, entry in self._standalone.items()
+                        if now - entry[0] < self._get_ttl()
+                    }
+                    self._standalone[key] = (now, value)
+                return value
+            finally:
+                with self._lock:
+                    if self._build_locks.get(key) is build_lock:
+                        del self._build_locks[key]
+
+    def clear(self):
+        """Drop the cached corpus and everything derived from it"""
+        with self._lock:
+            self._videos = None
+            self._loaded_at = 0.0
+            self._derived = {}
+            self._standalone = {}
+
+
+# Shared by every ReportService instance in this process
+corpus_cache = CorpusCache()
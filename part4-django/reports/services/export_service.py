@@ -0,0 +1,215 @@
+import csv
+import io
+import json
+import tempfile
+from typing import IO, Dict, Iterator, List, Optional
+from django.conf import settings
+from .aggregation import aggregate_chunk
+from .corpus_cache import corpus_cache
+from .query_planner import VideoQueryPlanner, get_video_user_id
+from .report_service import ReportService
+
+
+def _import_pyarrow():
+    """Import pyarrow on demand; it is only needed for Parquet/Arrow exports"""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet/Arrow export requires pyarrow. Install it with: pip install pyarrow")
+    return pyarrow
+
+
+class ExportService:
+    """Service to export the video corpus and per-user aggregates in bulk
+
+    Rows are produced in batches: videos page by page from the Node.js API
+    (or from the cached corpus when it is fresh), so memory stays flat
+    regardless of corpus size. Per-user aggregates hold one row per user.
+    """
+
+    DATASETS = ('videos', 'users')
+    TEXT_FORMATS = ('csv', 'ndjson')
+    FILE_FORMATS = ('parquet', 'arrow')
+    FORMATS = TEXT_FORMATS + FILE_FORMATS
+
+    CONTENT_TYPES = {
+        'csv': 'text/csv',
+        'ndjson': 'application/x-ndjson',
+        'parquet': 'application/vnd.apache.parquet',
+        'arrow': 'application/vnd.apache.arrow.file',
+    }
+
+    # Column name and Arrow type for each dataset
+    COLUMNS = {
+        'videos': [
+            ('id', 'int64'),
+            ('title', 'string'),
+            ('description', 'string'),
+            ('category', 'string'),
+            ('duration', 'int64'),
+            ('youtube_video_id', 'string'),
+            ('user_id', 'int64'),
+            ('user_name', 'string'),
+            ('user_email', 'string'),
+            ('created_at', 'string'),
+        ],
+        'users': [
+            ('user_id', 'int64'),
+            ('name', 'string'),
+            ('email', 'string'),
+            ('total_videos', 'int64'),
+            ('total_duration_seconds', 'int64'),
+        ],
+    }
+
+    def __init__(self, batch_size: Optional[int] = None):
+        self.report_service = ReportService()
+        self.batch_size = batch_size or getattr(settings, 'REPORT_EXPORT_BATCH_SIZE', 1000)
+
+    def validate(self, dataset: str, file_format: str):
+        """Raise ValueError for an unknown dataset or format"""
+        if dataset not in self.DATASETS:
+            raise ValueError(f"Invalid dataset '{dataset}'. Expected one of: {', '.join(self.DATASETS)}")
+        if file_format not in self.FORMATS:
+            raise ValueError(f"Invalid format '{file_format}'. Expected one of: {', '.join(self.FORMATS)}")
+
+    def get_column_names(self, dataset: str) -> List[str]:
+        """Column names of a dataset, in export order"""
+        return [name for name, _ in self.COLUMNS[dataset]]
+
+    def iter_row_batches(self, dataset: str, category: Optional[str] = None,
+                         search: Optional[str] = None) -> Iterator[List[Dict]]:
+        """Yield flat export rows for a dataset, one batch at a time"""
+        if dataset == 'videos':
+            for videos in self._iter_video_batches(category, search):
+                yield [self._video_row(video) for video in videos]
+            return
+
+        partial = None
+        for videos in self._iter_video_batches(category, search):
+            partial = aggregate_chunk(videos, partial=partial)
+        accumulators = partial['users'] if partial else {}
+
+        rows = [self._user_row(accumulators[user_id]) for user_id in sorted(accumulators)]
+        for start in range(0, len(rows), self.batch_size):
+            yield rows[start:start + self.batch_size]
+
+    def stream_text(self, dataset: str, file_format: str, **filters) -> Iterator[str]:
+        """Yield a CSV or NDJSON export as text chunks, one chunk per batch"""
+        return self._format_text(dataset, file_format, self.iter_row_batches(dataset, **filters))
+
+    def write_file(self, dataset: str, file_format: str, destination, **filters) -> int:
+        """Write a dataset to `destination` (path or binary file), returning the row count
+
+        Text formats are written chunk by chunk; Parquet gets one row group and
+        Arrow one record batch per batch of rows.
+        """
+        if file_format in self.TEXT_FORMATS:
+            return self._write_text_file(dataset, file_format, destination, **filters)
+
+        pa = _import_pyarrow()
+        schema = pa.schema([
+            (name, getattr(pa, type_name)()) for name, type_name in self.COLUMNS[dataset]
+        ])
+        if file_format == 'parquet':
+            writer = pa.parquet.ParquetWriter(destination, schema)
+        else:
+            writer = pa.ipc.new_file(destination, schema)
+
+        total_rows = 0
+        try:
+            for rows in self.iter_row_batches(dataset, **filters):
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                total_rows += len(rows)
+        finally:
+            writer.close()
+        return total_rows
+
+    def open_file(self, dataset: str, file_format: str, **filters) -> IO[bytes]:
+        """Write a dataset to a temporary file and return it rewound for reading
+
+        The file is removed as soon as it is closed.
+        """
+        export_file = tempfile.TemporaryFile()
+        try:
+            self.write_file(dataset, file_format, export_file, **filters)
+        except Exception:
+            export_file.close()
+            raise
+        export_file.seek(0)
+        return export_file
+
+    def _iter_video_batches(self, category: Optional[str], search: Optional[str]) -> Iterator[List[Dict]]:
+        """Yield matching videos in batches, without loading the corpus when it is not cached"""
+        if corpus_cache.is_fresh():
+            planner = VideoQueryPlanner(self.report_service.api_client)
+            videos = planner.fetch({'category': category, 'search': search})
+            for start in range(0, len(videos), self.batch_size):
+                yield videos[start:start + self.batch_size]
+            return
+
+        yield from self.report_service.api_client.iter_video_pages(search=search, category=category)
+
+    def _format_text(self, dataset: str, file_format: str, batches: Iterator[List[Dict]]) -> Iterator[str]:
+        if file_format == 'ndjson':
+            for rows in batches:
+                yield ''.join(json.dumps(row, default=str) + '\n' for row in rows)
+            return
+
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=self.get_column_names(dataset))
+        writer.writeheader()
+        for rows in batches:
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+        if buffer.tell():
+            # Header only - no rows matched
+            yield buffer.getvalue()
+
+    def _write_text_file(self, dataset: str, file_format: str, destination, **filters) -> int:
+        total_rows = 0
+
+        def counted_batches():
+            nonlocal total_rows
+            for rows in self.iter_row_batches(dataset, **filters):
+                total_rows += len(rows)
+                yield rows
+
+        chunks = self._format_text(dataset, file_format, counted_batches())
+        if isinstance(destination, (str, bytes)) or hasattr(destination, '__fspath__'):
+            with open(destination, 'w', encoding='utf-8', newline='') as export_file:
+                export_file.writelines(chunks)
+        else:
+            for chunk in chunks:
+                destination.write(chunk.encode('utf-8'))
+        return total_rows
+
+    def _video_row(self, video: Dict) -> Dict:
+        user_obj = video.get('user')
+        if not isinstance(user_obj, dict):
+            user_obj = {}
+        return {
+            'id': video.get('id'),
+            'title': video.get('title'),
+            'description': video.get('description'),
+            'category': video.get('category', 'Unknown'),
+            'duration': video.get('duration'),
+            'youtube_video_id': video.get('youtubeVideoId'),
+            'user_id': get_video_user_id(video),
+            'user_name': user_obj.get('name'),
+            'user_email': user_obj.get('email'),
+            'created_at': video.get('createdAt') or video.get('created_at'),
+        }
+
+    def _user_row(self, acc: Dict) -> Dict:
+        return {
+            'user_id': acc['user']['id'],
+            'name': acc['user']['name'],
+            'email': acc['user']['email'],
+            'total_videos': acc['total_videos'],
+            'total_duration_seconds': acc['total_duration_seconds'],
+        }
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from ..models import ReportJob
+from ..serializers import (
+    LeaderboardReportSerializer,
+    SummaryReportSerializer,
+    UserActivityReportSerializer,
+)
+from .report_service import ReportService
+
+
+def _validate_leaderboard(params: Dict):
+    # Same defaults as ReportService.generate_leaderboard_report
+    ReportService.validate_leaderboard_params(params.get('metric', 'videos'), params.get('limit', 10))
+
+
+# Report types that can run as jobs: ReportService method, serializer for the
+# stored result, accepted parameters with their types, required parameters,
+# and an optional check run at submit time so bad input fails with 400, not
+# later in the worker
+REPORT_JOB_TYPES = {
+    'summary': {
+        'method': 'generate_summary_report',
+        'serializer': SummaryReportSerializer,
+        'params': {'category': str, 'search': str, 'user_id': int},
+        'required': (),
+    },
+    'user': {
+        'method': 'generate_user_activity_report',
+        'serializer': UserActivityReportSerializer,
+        'params': {'user_id': int, 'category': str, 'search': str},
+        'required': ('user_id',),
+    },
+    'leaderboard': {
+        'method': 'generate_leaderboard_report',
+        'serializer': LeaderboardReportSerializer,
+        'params': {'metric': str, 'limit': int, 'category': str},
+        'required': (),
+        'validate': _validate_leaderboard,
+    },
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+# Jobs this process has taken on and not yet finished
+_dispatched = set()
+
+
+def get_job_executor() -> ThreadPoolExecutor:
+    """Process-wide worker pool for report jobs, created on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'REPORT_JOB_WORKERS', 2),
+                thread_name_prefix='report-job',
+            )
+        return _executor
+
+
+def get_worker_id() -> str:
+    """Identity recorded on the jobs this process dispatches and runs"""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _is_worker_alive(worker: str, job_id) -> Optional[bool]:
+    """Whether a job's owning process still has it, or None when it cannot be told
+
+    Only processes on this host can be checked; elsewhere jobs are left to the
+    REPORT_JOB_STALE_AFTER age limit.
+    """
+    host, _, pid = worker.rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit():
+        return None
+    if int(pid) == os.getpid():
+        # This process, or a restarted one that reused the PID
+        with _executor_lock:
+            return job_id in _dispatched
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class ReportJobService:
+    """Service to submit report jobs and run them on the local worker pool"""
+
+    def submit(self, report_type: str, params: Optional[Dict] = None) -> Tuple[ReportJob, bool]:
+        """Create a job, or join an identical one already pending or running
+
+        Returns the job and whether it was newly created.
+        """
+        params = self.normalize_params(report_type, params or {})
+        dedupe_key = self._dedupe_key(report_type, params)
+
+        for job in ReportJob.objects.filter(dedupe_key=dedupe_key, status__in=ReportJob.ACTIVE_STATUSES):
+            job = self.recover(job)
+            if job.status in ReportJob.ACTIVE_STATUSES:
+                return job, False
+
+        try:
+            with transaction.atomic():
+                job = ReportJob.objects.create(
+                    report_type=report_type, params=params, dedupe_key=dedupe_key,
+                    worker=get_worker_id(),
+                )
+        except IntegrityError:
+            # An identical job was created concurrently - join it, even if it
+            # has already finished (cached reports take milliseconds)
+            return ReportJob.objects.filter(dedupe_key=dedupe_key).first(), False
+
+        # Owned from now on, though only dispatched once the job row is
+        # visible to the worker's connection
+        with _executor_lock:
+            _dispatched.add(job.pk)
+        transaction.on_commit(lambda: self._dispatch(job.pk))
+        return job, True
+
+    def get(self, job_id) -> ReportJob:
+        """Fetch a job for polling, recovering it first if it was orphaned"""
+        return self.recover(ReportJob.objects.get(pk=job_id))
+
+    def recover(self, job: ReportJob) -> ReportJob:
+        """Deal with an active job whose worker is gone
+
+        Jobs older than REPORT_JOB_STALE_AFTER, or running in a process that no
+        longer has them (e.g. after a restart), are failed. Pending jobs whose
+        process is gone are dispatched again here; running them twice is
+        impossible because run() claims a job atomically.
+        """
+        if job.status not in ReportJob.ACTIVE_STATUSES:
+            return job
+
+        cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'REPORT_JOB_STALE_AFTER', 3600))
+        alive = _is_worker_alive(job.worker, job.pk)
+        if job.created_at < cutoff or (alive is False and job.status == ReportJob.STATUS_RUNNING):
+            ReportJob.objects.filter(pk=job.pk, status=job.status, worker=job.worker).update(
+                status=ReportJob.STATUS_FAILED,
+                error='Job abandoned',
+                finished_at=timezone.now(),
+            )
+        elif alive is False:
+            taken = ReportJob.objects.filter(
+                pk=job.pk, status=ReportJob.STATUS_PENDING, worker=job.worker
+            ).update(worker=get_worker_id())
+            if taken:
+                self._dispatch(job.pk)
+
+        job.refresh_from_db()
+        return job
+
+    def _dispatch(self, job_id):
+        with _executor_lock:
+            _dispatched.add(job_id)
+        get_job_executor().submit(_run_in_worker, job_id)
+
+    def run(self, job_id) -> ReportJob:
+        """Run a pending job and persist its result or error"""
+        # Claim the job atomically, so a job dispatched twice still runs once
+        claimed = ReportJob.objects.filter(pk=job_id, status=ReportJob.STATUS_PENDING).update(
+            status=ReportJob.STATUS_RUNNING, started_at=timezone.now(), worker=get_worker_id()
+        )
+        job = ReportJob.objects.get(pk=job_id)
+        if not claimed:
+            return job
+
+        job_type = REPORT_JOB_TYPES[job.report_type]
+        try:
+            report_service = ReportService()
+            report_data = getattr(report_service, job_type['method'])(**job.params)
+            job.result = job_type['serializer'](report_data).data
+            job.status = ReportJob.STATUS_SUCCEEDED
+        except Exception as e:
+            job.error = str(e)
+            job.status = ReportJob.STATUS_FAILED
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+        return job
+
+    def normalize_params(self, report_type: str, params: Dict) -> Dict:
+        """Validate and coerce job parameters, raising ValueError on bad input"""
+        if report_type not in REPORT_JOB_TYPES:
+            raise ValueError(
+                f"Invalid report type '{report_type}'. Expected one of: {', '.join(REPORT_JOB_TYPES)}"
+            )
+        if not isinstance(params, dict):
+            raise ValueError("Params must be an object")
+
+        job_type = REPORT_JOB_TYPES[report_type]
+        unknown = set(params) - set(job_type['params'])
+        if unknown:
+            raise ValueError(f"Unknown params for {report_type} report: {', '.join(sorted(unknown))}")
+
+        normalized = {}
+        for name, cast in job_type['params'].items():
+            value = params.get(name)
+            if value in (None, ''):
+                continue
+            # Only JSON scalars: a dict or list would be stored (and deduped) as its repr
+            if isinstance(value, bool) or not isinstance(value, (str, int)):
+                raise ValueError(f"Invalid value for '{name}'")
+            try:
+                normalized[name] = cast(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid value for '{name}'")
+
+        missing = [name for name in job_type['required'] if name not in normalized]
+        if missing:
+            raise ValueError(f"Missing params for {report_type} report: {', '.join(missing)}")
+        if 'validate' in job_type:
+            job_type['validate'](normalized)
+        return normalized
+
+    def _dedupe_key(self, report_type: str, params: Dict) -> str:
+        payload = json.dumps([report_type, params], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _run_in_worker(job_id):
+    """Worker pool entry point; each worker thread owns (and closes) its DB connection"""
+    try:
+        ReportJobService().run(job_id)
+    finally:
+        with _executor_lock:
+            _dispatched.discard(job_id)
+        connection.close()
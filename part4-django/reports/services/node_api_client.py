@@ -1,13 +1,29 @@
-import requests
-import aiohttp
-import asyncio
+import importlib
 from django.conf import settings
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
+
+
+def _import_client(name: str):
+    """Import an HTTP client library on first use
+
+    `requests` and `aiohttp` are slow to import and most processes only ever
+    need one of them, so neither is loaded at startup.
+    """
+    return importlib.import_module(name)
+
+
+def __getattr__(name):
+    # Keep `node_api_client.requests` / `.aiohttp` resolvable (e.g. for mock.patch)
+    if name in ('requests', 'aiohttp'):
+        return _import_client(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class NodeApiClient:
     """Client to fetch data from Node.js API"""
     
+    VIDEO_PAGE_SIZE = 1000  # Videos requested per page
+    
     def __init__(self):
         self.base_url = settings.NODE_API_BASE_URL
         self.timeout = 60  # Increased for Render's free tier cold starts (30-60 seconds)
@@ -24,6 +40,7 @@ class NodeApiClient:
         Note: This endpoint requires authentication.
         If authentication fails, returns empty list (for summary report fallback).
         """
+        requests = _import_client('requests')
         try:
             # Note: This endpoint requires authentication
             # In production, you'd need to pass a token
@@ -47,6 +64,35 @@ class NodeApiClient:
     
     def get_videos(self, search: Optional[str] = None, category: Optional[str] = None) -> List[Dict]:
         """Fetch all videos from Node.js API (handles pagination automatically)"""
+        all_videos = []
+        for videos in self.iter_video_pages(search=search, category=category):
+            all_videos.extend(videos)
+        return all_videos
+    
+    def iter_video_pages(self, search: Optional[str] = None, category: Optional[str] = None) -> Iterator[List[Dict]]:
+        """Yield videos from Node.js API one page at a time
+        
+        Only a single page is held in memory, so callers that stream results
+        (e.g. exports) stay flat regardless of corpus size.
+        """
+        page = 1
+        while True:
+            data = self.get_video_page(page, search=search, category=category)
+            yield data.get('videos', [])
+            
+            # Check if there are more pages
+            pagination = data.get('pagination', {})
+            current_page = pagination.get('page', 1)
+            total_pages = pagination.get('totalPages', 1)
+            
+            if current_page >= total_pages:
+                break
+            
+            page = current_page + 1
+    
+    def get_video_page(self, page: int, search: Optional[str] = None, category: Optional[str] = None) -> Dict:
+        """Fetch one page of videos, returning the raw response (`videos` and `pagination`)"""
+        requests = _import_client('requests')
         try:
             params = {}
             if search:
@@ -54,34 +100,17 @@ class NodeApiClient:
             if category:
                 params['category'] = category
             
-            # Set a high limit to get all videos (or fetch all pages)
-            params['limit'] = 1000  # Get up to 1000 videos per request
-            params['page'] = 1
-            
-            all_videos = []
-            while True:
-                response = requests.get(
-                    f'{self.base_url}/videos',
-                    headers=self._get_headers(),
-                    params=params,
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                data = response.json()
-                videos = data.get('videos', [])
-                all_videos.extend(videos)
-                
-                # Check if there are more pages
-                pagination = data.get('pagination', {})
-                current_page = pagination.get('page', 1)
-                total_pages = pagination.get('totalPages', 1)
-                
-                if current_page >= total_pages:
-                    break
-                
-                params['page'] = current_page + 1
+            params['limit'] = self.VIDEO_PAGE_SIZE
+            params['page'] = page
             
-            return all_videos
+            response = requests.get(
+                f'{self.base_url}/videos',
+                headers=self._get_headers(),
+                params=params,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            return response.json()
         except requests.exceptions.Timeout:
             raise Exception(f"Request timed out after {self.timeout} seconds. Render free tier may be sleeping. Please try again in 30-60 seconds.")
         except requests.RequestException as e:
@@ -89,6 +118,7 @@ class NodeApiClient:
     
     async def get_users_async(self) -> List[Dict]:
         """Async version to fetch all users"""
+        aiohttp = _import_client('aiohttp')
         try:
             async with aiohttp.ClientSession() as session:
                 async with session.get(
@@ -104,6 +134,7 @@ class NodeApiClient:
     
     async def get_videos_async(self, search: Optional[str] = None, category: Optional[str] = None) -> List[Dict]:
         """Async version to fetch all videos"""
+        aiohttp = _import_client('aiohttp')
         try:
             params = {}
             if search:
@@ -130,6 +161,7 @@ class NodeApiClient:
         Note: This endpoint requires authentication.
         Returns None if user not found or authentication fails.
         """
+        requests = _import_client('requests')
         try:
             response = requests.get(
                 f'{self.base_url}/users/{user_id}',
@@ -0,0 +1,111 @@
+import hmac
+import io
+import pstats
+import re
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+from django.conf import settings
+
+
+PROFILE_HEADER = 'HTTP_X_REPORT_PROFILE'
+PROFILE_QUERY_PARAM = 'profile'
+PROFILE_NAME_RE = re.compile(r'^[\w.-]+\.prof$')
+
+# Frames shown in capture summaries: the API client and the report services
+SUMMARY_FRAME_PATTERN = r'reports[/\\]services'
+
+
+def is_profiling_allowed(request) -> bool:
+    """Whether the caller may profile requests and read captures
+
+    The token is always required and only accepted in the `X-Report-Profile`
+    header, never in the query string, where it would end up in access logs
+    and Referer headers. REPORT_PROFILING_ALLOWED_IPS, when set, additionally
+    restricts which addresses may use it.
+    """
+    token = getattr(settings, 'REPORT_PROFILING_TOKEN', '')
+    if not token:
+        return False
+
+    presented = request.META.get(PROFILE_HEADER)
+    # Compare bytes: compare_digest rejects non-ASCII str
+    if not presented or not hmac.compare_digest(presented.encode(), token.encode()):
+        return False
+
+    allowed_ips = getattr(settings, 'REPORT_PROFILING_ALLOWED_IPS', [])
+    return not allowed_ips or request.META.get('REMOTE_ADDR') in allowed_ips
+
+
+def wants_profile(request) -> bool:
+    """Whether the request asks to be profiled (`X-Report-Profile` header or `?profile=1`)"""
+    return PROFILE_HEADER in request.META or request.GET.get(PROFILE_QUERY_PARAM) == '1'
+
+
+class ProfileStore:
+    """Rotating on-disk store for per-request profile captures
+
+    Each capture is a pstats dump (`.prof`, readable with pstats or snakeviz);
+    only the newest `max_files` captures are kept.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_files: Optional[int] = None):
+        self.directory = Path(directory or getattr(settings, 'REPORT_PROFILE_DIR'))
+        self.max_files = max_files or getattr(settings, 'REPORT_PROFILE_MAX_FILES', 20)
+
+    def new_name(self, path: str) -> str:
+        """Capture name for a request path"""
+        slug = re.sub(r'[^\w]+', '-', path).strip('-') or 'root'
+        timestamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+        return f'{timestamp}-{slug[:60]}-{uuid.uuid4().hex[:8]}.prof'
+
+    def save(self, profiler, path: str, name: Optional[str] = None) -> str:
+        """Dump a finished profiler for a request path, returning the capture name
+
+        Pass `name` (from new_name()) when it had to be announced before the
+        capture was finished, e.g. for streamed responses.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = name or self.new_name(path)
+        profiler.dump_stats(str(self.directory / name))
+        self._rotate()
+        return name
+
+    def list(self) -> List[Dict]:
+        """Captures, newest first"""
+        captures = []
+        for path in self._capture_paths():
+            stat = path.stat()
+            captures.append({
+                'name': path.name,
+                'size_bytes': stat.st_size,
+                'created_at': datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(),
+            })
+        return captures
+
+    def get_path(self, name: str) -> Path:
+        """Path of a capture, raising FileNotFoundError for unknown or unsafe names"""
+        if not PROFILE_NAME_RE.match(name):
+            raise FileNotFoundError(name)
+        path = self.directory / name
+        if not path.is_file():
+            raise FileNotFoundError(name)
+        return path
+
+    def summarize(self, name: str, limit: int = 40) -> str:
+        """Text summary of a capture, by cumulative time, limited to service frames"""
+        output = io.StringIO()
+        stats = pstats.Stats(str(self.get_path(name)), stream=output)
+        stats.sort_stats('cumulative').print_stats(SUMMARY_FRAME_PATTERN, limit)
+        return output.getvalue()
+
+    def _capture_paths(self) -> List[Path]:
+        if not self.directory.is_dir():
+            return []
+        paths = [path for path in self.directory.iterdir() if PROFILE_NAME_RE.match(path.name)]
+        return sorted(paths, key=lambda path: (path.stat().st_mtime, path.name), reverse=True)
+
+    def _rotate(self):
+        for path in self._capture_paths()[self.max_files:]:
+            path.unlink(missing_ok=True)
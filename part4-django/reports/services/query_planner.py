@@ -0,0 +1,109 @@
+from typing import Dict, List, Optional
+from .corpus_cache import CorpusCache, corpus_cache
+
+
+def get_video_user_id(video: Dict) -> Optional[int]:
+    """Get the owner's user ID from a video, trying every known field layout"""
+    # Direct fields (camelCase or snake_case)
+    user_id = video.get('userId') or video.get('user_id')
+
+    # Nested user object
+    if not user_id:
+        user_obj = video.get('user')
+        if user_obj:
+            if isinstance(user_obj, dict):
+                user_id = user_obj.get('id')
+            elif hasattr(user_obj, 'id'):
+                user_id = user_obj.id
+
+    return int(user_id) if user_id else None  # Ensure it's an integer
+
+
+def category_key(category: Optional[str]) -> str:
+    """Normalize a category for comparison
+
+    The Node.js API matches categories case-insensitively (MySQL collation),
+    so local filtering must too or results would depend on cache state.
+    """
+    return (category or 'Unknown').casefold()
+
+
+class VideoQueryPlanner:
+    """Decides where each report filter is evaluated and fetches matching videos
+
+    Filters the Node.js API understands (`search`, `category`) are pushed down
+    so only matching rows are transferred. Everything else (`user_id`) is
+    evaluated locally against an index built over the cached corpus. When the
+    corpus is already cached, every filter is answered locally instead.
+    """
+
+    PUSHDOWN_FILTERS = ('search', 'category')
+    LOCAL_FILTERS = ('user_id',)
+
+    def __init__(self, api_client, cache: CorpusCache = corpus_cache):
+        self.api_client = api_client
+        self.cache = cache
+
+    def plan(self, filters: Dict) -> Dict:
+        """Build an execution plan for the given filters
+
+        Returns a dict with `source` ('cache' or 'api'), the `pushdown` filters
+        sent upstream and the `local` filters applied in-process.
+        """
+        active = {key: value for key, value in filters.items() if value not in (None, '')}
+        pushdown = {key: active[key] for key in self.PUSHDOWN_FILTERS if key in active}
+
+        # Nothing to push down, or the whole corpus is at hand anyway
+        if not pushdown or self.cache.is_fresh():
+            return {'source': 'cache', 'pushdown': {}, 'local': active}
+
+        local = {key: value for key, value in active.items() if key not in pushdown}
+        return {'source': 'api', 'pushdown': pushdown, 'local': local}
+
+    def fetch(self, filters: Dict) -> List[Dict]:
+        """Return the videos matching `filters`, following the plan"""
+        plan = self.plan(filters)
+        local = plan['local']
+
+        if plan['source'] == 'api':
+            videos = self.api_client.get_videos(**plan['pushdown'])
+            return [video for video in videos if self._matches(video, local)]
+
+        index = self.cache.get_derived('video_index', self._build_index, self.api_client.get_videos)
+
+        # Start from the narrowest indexed bucket, then check the rest row by row
+        if 'user_id' in local:
+            candidates = index['by_user'].get(int(local['user_id']), [])
+        elif 'category' in local:
+            candidates = index['by_category'].get(category_key(local['category']), [])
+        else:
+            candidates = index['all']
+
+        return [video for video in candidates if self._matches(video, local)]
+
+    def _build_index(self, videos: List[Dict]) -> Dict:
+        """Index the corpus by owner and by (case-folded) category"""
+        by_user = {}
+        by_category = {}
+        for video in videos:
+            user_id = get_video_user_id(video)
+            if user_id:
+                by_user.setdefault(user_id, []).append(video)
+            by_category.setdefault(category_key(video.get('category', 'Unknown')), []).append(video)
+
+        return {'all': videos, 'by_user': by_user, 'by_category': by_category}
+
+    def _matches(self, video: Dict, filters: Dict) -> bool:
+        """Check a video against locally evaluated filters"""
+        if 'user_id' in filters and get_video_user_id(video) != int(filters['user_id']):
+            return False
+        if 'category' in filters and category_key(video.get('category', 'Unknown')) != category_key(filters['category']):
+            return False
+        if 'search' in filters:
+            # Mirrors the Node.js API: case-insensitive substring of title or description
+            needle = filters['search'].lower()
+            title = (video.get('title') or '').lower()
+            description = (video.get('description') or '').lower()
+            if needle not in title and needle not in description:
+                return False
+        return True
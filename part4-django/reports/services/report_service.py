@@ -1,37 +1,55 @@
-from typing import Dict, List
+import heapq
+from typing import Dict, List, Optional
 from collections import Counter
+from .aggregation import AggregationEngine, aggregate_chunk
+from .corpus_cache import corpus_cache
 from .node_api_client import NodeApiClient
+from .query_planner import VideoQueryPlanner
 
 
 class ReportService:
     """Service to generate reports from Node.js API data"""
     
+    LEADERBOARD_METRICS = {
+        'videos': 'total_videos',
+        'duration': 'total_duration_seconds',
+    }
+    LEADERBOARD_MAX_LIMIT = 100
+    
     def __init__(self):
         self.api_client = NodeApiClient()
+        self.aggregation_engine = AggregationEngine()
+    
+    def _get_videos(self) -> List[Dict]:
+        """Get the full video corpus, served from the process-wide cache when fresh"""
+        return corpus_cache.get_videos(self.api_client.get_videos)
+    
+    def _get_filtered_videos(self, **filters) -> List[Dict]:
+        """Get only the videos matching `filters`, pushed down to the API where possible"""
+        return VideoQueryPlanner(self.api_client).fetch(filters)
     
-    def generate_summary_report(self) -> Dict:
-        """Generate summary report with total users, videos, and top categories"""
+    def generate_summary_report(self, category: Optional[str] = None, search: Optional[str] = None,
+                                user_id: Optional[int] = None) -> Dict:
+        """Generate summary report with total users, videos, and top categories
+        
+        Optional `category`, `search` and `user_id` filters scope the report to
+        the matching videos.
+        """
         try:
-            # Get videos first (they don't require authentication)
-            videos = self.api_client.get_videos()
+            filters = {'category': category, 'search': search, 'user_id': user_id}
+            scoped = any(value not in (None, '') for value in filters.values())
             
-            # Try to get users, but fallback to counting unique user IDs from videos
-            # if authentication is required (users endpoint needs auth)
-            try:
-                users = self.api_client.get_users()
-                # If we got users successfully and the list is not empty, use it
-                if users and len(users) > 0:
-                    total_users = len(users)
-                else:
-                    # Empty list means auth failed, count from videos
-                    total_users = self._count_unique_users_from_videos(videos)
-            except Exception as e:
-                # If users endpoint fails, count unique user IDs from videos
-                total_users = self._count_unique_users_from_videos(videos)
+            if scoped:
+                # Get only the matching videos (they don't require authentication)
+                aggregates = aggregate_chunk(self._get_filtered_videos(**filters))
+                # Scoped reports only count the users owning the matching videos
+                total_users = len(aggregates['users'])
+            else:
+                aggregates = self._get_corpus_aggregates()
+                total_users = self._count_total_users(aggregates)
             
             # Count videos by category
-            categories = [video.get('category', 'Unknown') for video in videos]
-            category_counts = Counter(categories)
+            category_counts = aggregates['category_counts']
             top_categories = [
                 {'category': cat, 'count': count}
                 for cat, count in category_counts.most_common(5)
@@ -39,69 +57,91 @@ class ReportService:
             
             return {
                 'total_users': total_users,
-                'total_videos': len(videos),
+                'total_videos': aggregates['total_videos'],
                 'top_categories': top_categories,
                 'categories_count': len(category_counts),
+                'filters': {key: value for key, value in filters.items() if value not in (None, '')},
             }
         except Exception as e:
             raise Exception(f"Failed to generate summary report: {str(e)}")
     
-    def _count_unique_users_from_videos(self, videos: List[Dict]) -> int:
-        """Count unique user IDs from video list"""
-        unique_user_ids = set()
-        for video in videos:
-            # Try multiple possible field names and structures
-            user_id = None
-            
-            # Direct fields (camelCase or snake_case)
-            user_id = video.get('userId') or video.get('user_id')
-            
-            # Nested user object
-            if not user_id:
-                user_obj = video.get('user')
-                if user_obj:
-                    if isinstance(user_obj, dict):
-                        user_id = user_obj.get('id')
-                    elif hasattr(user_obj, 'id'):
-                        user_id = user_obj.id
-            
-            if user_id:
-                unique_user_ids.add(int(user_id))  # Ensure it's an integer
+    def _count_total_users(self, aggregates: Dict) -> int:
+        """Count all users via the API, falling back to unique user IDs from videos
         
-        return len(unique_user_ids)
+        The count is cached like the corpus, so a cached summary makes no
+        upstream call at all.
+        """
+        total_users = corpus_cache.get_standalone('total_users', self._fetch_user_count)
+        return total_users or len(aggregates['users'])
     
-    def generate_user_activity_report(self, user_id: int) -> Dict:
-        """Generate activity report for a specific user"""
+    def _fetch_user_count(self) -> int:
+        """Number of users from the API, or 0 when it cannot be listed"""
+        # The users endpoint needs auth; without it we get an empty list
         try:
-            # Get all videos first (they don't require authentication)
-            videos = self.api_client.get_videos()
-            
-            # Filter videos by user (check multiple possible field locations)
-            user_videos = []
-            user_info = None  # Will be populated from API or videos
+            return len(self.api_client.get_users() or [])
+        except Exception:
+            return 0
+    
+    def _get_corpus_aggregates(self, category: Optional[str] = None) -> Dict:
+        """Per-category and per-user stats over the whole corpus, cached alongside it
+        
+        With aggregation workers enabled and no corpus cached, worker processes
+        fetch and aggregate the pages instead of loading the corpus here; their
+        results are reused for as long as they are fresh.
+        """
+        key = ('aggregates', category)
+        parallel_build = self.aggregation_engine.parallel and not corpus_cache.is_fresh()
+        if parallel_build or corpus_cache.has_standalone(key):
+            return corpus_cache.get_standalone(
+                key, lambda: self.aggregation_engine.aggregate_corpus(self.api_client, category)
+            )
+        return corpus_cache.get_derived(
+            key,
+            lambda videos: aggregate_chunk(videos, category),
+            self.api_client.get_videos,
+        )
+    
+    @staticmethod
+    def is_report_cached(report: str, params) -> bool:
+        """Whether a report can be generated without calling the Node.js API
+        
+        `report` is 'summary', 'user', 'leaderboard' or 'export'; `params` are
+        the request's query parameters.
+        """
+        if report == 'summary':
+            if any(params.get(name) for name in ('category', 'search', 'user_id')):
+                return corpus_cache.is_fresh()
+            aggregates_cached = corpus_cache.is_fresh() or corpus_cache.has_standalone(('aggregates', None))
+            return aggregates_cached and corpus_cache.has_standalone('total_users')
+        if report == 'leaderboard':
+            return corpus_cache.is_fresh() or corpus_cache.has_standalone(
+                ('aggregates', params.get('category') or None)
+            )
+        # User reports and exports read the corpus itself
+        return corpus_cache.is_fresh()
+    
+    def generate_user_activity_report(self, user_id: int, category: Optional[str] = None,
+                                      search: Optional[str] = None) -> Dict:
+        """Generate activity report for a specific user
+        
+        Optional `category` and `search` filters scope the report to the
+        user's matching videos; when none match, the report is empty.
+        """
+        try:
+            # Get the user's videos (they don't require authentication)
+            user_videos = self._get_filtered_videos(user_id=user_id, category=category, search=search)
+            user_info = None  # Will be populated from videos or API
             
-            for video in videos:
-                video_user_id = None
-                # Try direct fields
-                video_user_id = video.get('userId') or video.get('user_id')
-                # Try nested user object
-                if not video_user_id:
-                    user_obj = video.get('user')
-                    if user_obj:
-                        if isinstance(user_obj, dict):
-                            video_user_id = user_obj.get('id')
-                            # If we found user info in video, save it
-                            if not user_info and int(video_user_id) == user_id:
-                                user_info = {
-                                    'id': user_obj.get('id'),
-                                    'name': user_obj.get('name', 'Unknown User'),
-                                    'email': user_obj.get('email', 'N/A'),
-                                }
-                        elif hasattr(user_obj, 'id'):
-                            video_user_id = user_obj.id
-                
-                if video_user_id and int(video_user_id) == user_id:
-                    user_videos.append(video)
+            # If we find user info in a video, use it
+            for video in user_videos:
+                user_obj = video.get('user')
+                if isinstance(user_obj, dict):
+                    user_info = {
+                        'id': user_obj.get('id'),
+                        'name': user_obj.get('name', 'Unknown User'),
+                        'email': user_obj.get('email', 'N/A'),
+                    }
+                    break
             
             # Try to get user from API (requires auth, but we have fallback)
             if not user_info:
@@ -115,8 +155,9 @@ class ReportService:
             
             # If still no user info, create a basic one from the user_id
             if not user_info:
-                if len(user_videos) > 0:
-                    # We have videos but no user info - create basic user object
+                # A scoped report with no matching videos is an empty report, not a missing user
+                if len(user_videos) > 0 or category or search:
+                    # We have videos (or filters) but no user info - create basic user object
                     user_info = {
                         'id': user_id,
                         'name': 'Unknown User',
@@ -158,4 +199,52 @@ class ReportService:
             return f"{minutes}m {secs}s"
         else:
             return f"{secs}s"
-
+    
+    @classmethod
+    def validate_leaderboard_params(cls, metric: str, limit: int):
+        """Raise ValueError for an unknown metric or an out-of-range limit"""
+        if metric not in cls.LEADERBOARD_METRICS:
+            raise ValueError(
+                f"Invalid metric '{metric}'. Expected one of: {', '.join(cls.LEADERBOARD_METRICS)}"
+            )
+        if limit < 1 or limit > cls.LEADERBOARD_MAX_LIMIT:
+            raise ValueError(f"Limit must be between 1 and {cls.LEADERBOARD_MAX_LIMIT}")
+    
+    def generate_leaderboard_report(self, metric: str = 'videos', limit: int = 10,
+                                    category: Optional[str] = None) -> Dict:
+        """Generate a top-N users leaderboard by video count or total duration
+        
+        Per-user accumulators are built in a single (possibly parallel) pass
+        over the corpus and cached alongside it (one set per category), so
+        repeated leaderboard calls only pay for the bounded heap selection.
+        """
+        self.validate_leaderboard_params(metric, limit)
+        
+        try:
+            accumulators = self._get_corpus_aggregates(category)['users']
+            
+            # Bounded heap: O(U log N) instead of sorting every user
+            field = self.LEADERBOARD_METRICS[metric]
+            leaders = heapq.nlargest(
+                limit,
+                accumulators.values(),
+                key=lambda acc: (acc[field], -acc['user']['id']),
+            )
+            
+            return {
+                'metric': metric,
+                'category': category,
+                'total_users': len(accumulators),
+                'leaders': [
+                    {
+                        'rank': rank,
+                        'user': acc['user'],
+                        'total_videos': acc['total_videos'],
+                        'total_duration_seconds': acc['total_duration_seconds'],
+                        'total_duration_formatted': self._format_duration(acc['total_duration_seconds']),
+                    }
+                    for rank, acc in enumerate(leaders, start=1)
+                ],
+            }
+        except Exception as e:
+            raise Exception(f"Failed to generate leaderboard report: {str(e)}")
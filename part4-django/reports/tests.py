@@ -1,13 +1,37 @@
-from django.test import TestCase
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import skipUnless
+from django.conf import settings
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from unittest.mock import Mock, patch
+from .services.admission import AdmissionLimiter, AdmissionSlot, admission_controller
+from .services.aggregation import AggregationEngine, aggregate_chunk, shutdown_aggregation_pool
+from .models import ReportJob
+from .services.corpus_cache import corpus_cache
+from .services.export_service import ExportService
+from .services.job_service import ReportJobService, get_worker_id
 from .services.report_service import ReportService
 from .services.node_api_client import NodeApiClient
+from .services.profiling import ProfileStore
+from .services.query_planner import VideoQueryPlanner
 
 
 class ReportServiceTestCase(TestCase):
     """Test cases for ReportService"""
     
     def setUp(self):
+        corpus_cache.clear()
         self.report_service = ReportService()
     
     @patch('reports.services.report_service.NodeApiClient')
@@ -118,6 +142,88 @@ class ReportServiceTestCase(TestCase):
             service.generate_user_activity_report(999)
         
         self.assertIn('not found', str(context.exception).lower())
+    
+    @patch('reports.services.report_service.NodeApiClient')
+    def test_scoped_user_report_without_matches(self, mock_api_client_class):
+        """Test a scoped user report with no matching videos is empty rather than an error"""
+        mock_client = mock_api_client_class.return_value
+        # The category is pushed down and the user has no Music videos
+        mock_client.get_videos.return_value = []
+        # Without auth the users endpoint yields nothing
+        mock_client.get_user_by_id.return_value = None
+        
+        response = self.client.get('/api/report/user/1/?category=Music')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_videos'], 0)
+        self.assertEqual(response.json()['user']['id'], 1)
+    
+    @patch('reports.services.report_service.NodeApiClient')
+    def test_generate_leaderboard_report(self, mock_api_client_class):
+        """Test top-N leaderboard by video count and by duration"""
+        # Mock API client
+        mock_client = Mock(spec=NodeApiClient)
+        mock_api_client_class.return_value = mock_client
+        
+        mock_client.get_videos.return_value = [
+            {'id': 1, 'category': 'Education', 'userId': 1, 'duration': 100},
+            {'id': 2, 'category': 'Education', 'userId': 1, 'duration': 100},
+            {'id': 3, 'category': 'Technology', 'userId': 1, 'duration': 100},
+            {'id': 4, 'category': 'Education', 'userId': 2, 'duration': 900},
+            {'id': 5, 'category': 'Technology', 'user': {'id': 3, 'name': 'User 3', 'email': 'u3@example.com'}, 'duration': None},
+        ]
+        
+        service = ReportService()
+        service.api_client = mock_client
+        
+        # By video count
+        report = service.generate_leaderboard_report(metric='videos', limit=2)
+        self.assertEqual(report['total_users'], 3)
+        self.assertEqual(len(report['leaders']), 2)
+        self.assertEqual(report['leaders'][0]['user']['id'], 1)
+        self.assertEqual(report['leaders'][0]['total_videos'], 3)
+        self.assertEqual(report['leaders'][0]['rank'], 1)
+        # Tie on one video each is broken by the lower user ID
+        self.assertEqual(report['leaders'][1]['user']['id'], 2)
+        
+        # By duration, filtered to one category
+        report = service.generate_leaderboard_report(metric='duration', category='Technology')
+        self.assertEqual(report['total_users'], 2)
+        self.assertEqual(report['leaders'][0]['user']['id'], 1)
+        self.assertEqual(report['leaders'][0]['total_duration_seconds'], 100)
+        self.assertEqual(report['leaders'][1]['user']['name'], 'User 3')
+        
+        # Corpus is fetched once and reused for every leaderboard
+        mock_client.get_videos.assert_called_once()
+    
+    def test_leaderboard_invalid_metric(self):
+        """Test leaderboard rejects unknown metrics and out-of-range limits"""
+        with self.assertRaises(ValueError):
+            self.report_service.generate_leaderboard_report(metric='likes')
+        with self.assertRaises(ValueError):
+            self.report_service.generate_leaderboard_report(limit=0)
+    
+    @patch('reports.services.report_service.NodeApiClient')
+    def test_generate_summary_report_with_filters(self, mock_api_client_class):
+        """Test category-scoped summary pushes the filter down to the API"""
+        # Mock API client
+        mock_client = Mock(spec=NodeApiClient)
+        mock_api_client_class.return_value = mock_client
+        
+        mock_client.get_videos.return_value = [
+            {'id': 1, 'title': 'Video 1', 'category': 'Education', 'userId': 1},
+            {'id': 2, 'title': 'Video 2', 'category': 'Education', 'userId': 2},
+        ]
+        
+        service = ReportService()
+        service.api_client = mock_client
+        
+        report = service.generate_summary_report(category='Education')
+        
+        mock_client.get_videos.assert_called_once_with(category='Education')
+        mock_client.get_users.assert_not_called()
+        self.assertEqual(report['total_users'], 2)
+        self.assertEqual(report['total_videos'], 2)
+        self.assertEqual(report['filters'], {'category': 'Education'})
 
 
 class NodeApiClientTestCase(TestCase):
@@ -169,3 +275,707 @@ class NodeApiClientTestCase(TestCase):
         self.assertIn('search', call_args[1]['params'])
         self.assertIn('category', call_args[1]['params'])
 
+
+class VideoQueryPlannerTestCase(TestCase):
+    """Test cases for VideoQueryPlanner"""
+    
+    def setUp(self):
+        corpus_cache.clear()
+        self.mock_client = Mock(spec=NodeApiClient)
+        self.mock_client.get_videos.return_value = [
+            {'id': 1, 'title': 'Intro to Python', 'category': 'Education', 'userId': 1},
+            {'id': 2, 'title': 'Cooking', 'description': 'python recipes', 'category': 'Lifestyle', 'userId': 1},
+            {'id': 3, 'title': 'Django Tips', 'category': 'Education', 'user': {'id': 2}},
+        ]
+        self.planner = VideoQueryPlanner(self.mock_client)
+    
+    def test_plan_pushes_down_supported_filters(self):
+        """Test search/category go upstream while user_id stays local"""
+        plan = self.planner.plan({'category': 'Education', 'search': 'x', 'user_id': 1})
+        
+        self.assertEqual(plan['source'], 'api')
+        self.assertEqual(plan['pushdown'], {'search': 'x', 'category': 'Education'})
+        self.assertEqual(plan['local'], {'user_id': 1})
+    
+    def test_user_filter_uses_cached_index(self):
+        """Test user-only filters load the corpus once and answer from the index"""
+        self.assertEqual(self.planner.plan({'user_id': 1})['source'], 'cache')
+        
+        videos = self.planner.fetch({'user_id': 1})
+        self.assertEqual([video['id'] for video in videos], [1, 2])
+        
+        videos = self.planner.fetch({'user_id': 2})
+        self.assertEqual([video['id'] for video in videos], [3])
+        self.mock_client.get_videos.assert_called_once_with()
+    
+    def test_filters_evaluated_locally_when_corpus_cached(self):
+        """Test a warm corpus answers pushdown-capable filters without an API call"""
+        self.planner.fetch({})
+        
+        plan = self.planner.plan({'category': 'Education', 'search': 'PYTHON'})
+        self.assertEqual(plan['source'], 'cache')
+        
+        videos = self.planner.fetch({'search': 'PYTHON'})
+        self.assertEqual([video['id'] for video in videos], [1, 2])
+        videos = self.planner.fetch({'category': 'Education', 'user_id': 2})
+        self.assertEqual([video['id'] for video in videos], [3])
+        self.mock_client.get_videos.assert_called_once_with()
+    
+    def test_category_filter_is_case_insensitive(self):
+        """Test warm-cache category filters match like the Node.js API (case-insensitively)"""
+        self.planner.fetch({})
+        
+        videos = self.planner.fetch({'category': 'education'})
+        self.assertEqual([video['id'] for video in videos], [1, 3])
+        videos = self.planner.fetch({'category': 'EDUCATION', 'user_id': 1})
+        self.assertEqual([video['id'] for video in videos], [1])
+        
+        service = ReportService()
+        service.api_client = self.mock_client
+        report = service.generate_leaderboard_report(category='education')
+        self.assertEqual(report['total_users'], 2)
+
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class ExportServiceTestCase(TestCase):
+    """Test cases for ExportService"""
+    
+    def setUp(self):
+        corpus_cache.clear()
+        self.mock_client = Mock(spec=NodeApiClient)
+        # Two pages from the Node.js API
+        self.mock_client.iter_video_pages.return_value = iter([
+            [
+                {'id': 1, 'title': 'Video 1', 'category': 'Education', 'duration': 300,
+                 'user': {'id': 1, 'name': 'User 1', 'email': 'user1@example.com'}},
+                {'id': 2, 'title': 'Video, 2', 'category': 'Education', 'duration': 600, 'userId': 2},
+            ],
+            [
+                {'id': 3, 'title': 'Video 3', 'category': 'Technology', 'duration': None, 'userId': 1},
+            ],
+        ])
+        self.export_service = ExportService(batch_size=2)
+        self.export_service.report_service.api_client = self.mock_client
+    
+    def test_stream_videos_csv(self):
+        """Test CSV export streams one chunk per page with a single header"""
+        chunks = list(self.export_service.stream_text('videos', 'csv', category='Education'))
+        
+        self.assertEqual(len(chunks), 2)
+        self.mock_client.iter_video_pages.assert_called_once_with(search=None, category='Education')
+        lines = ''.join(chunks).splitlines()
+        self.assertEqual(lines[0], ','.join(self.export_service.get_column_names('videos')))
+        self.assertEqual(len(lines), 4)
+        self.assertIn('"Video, 2"', lines[2])
+    
+    def test_stream_users_ndjson(self):
+        """Test NDJSON export of per-user aggregates"""
+        chunks = list(self.export_service.stream_text('users', 'ndjson'))
+        rows = [json.loads(line) for line in ''.join(chunks).splitlines()]
+        
+        self.assertEqual([row['user_id'] for row in rows], [1, 2])
+        self.assertEqual(rows[0]['name'], 'User 1')
+        self.assertEqual(rows[0]['total_videos'], 2)
+        self.assertEqual(rows[0]['total_duration_seconds'], 300)
+        self.assertEqual(rows[1]['total_duration_seconds'], 600)
+    
+    @skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_write_parquet_row_groups(self):
+        """Test Parquet export writes one row group per batch"""
+        import pyarrow.parquet as pq
+        
+        export_file = self.export_service.open_file('videos', 'parquet')
+        parquet_file = pq.ParquetFile(export_file)
+        
+        self.assertEqual(parquet_file.metadata.num_rows, 3)
+        self.assertEqual(parquet_file.num_row_groups, 2)
+        self.assertEqual(parquet_file.read().column('user_id').to_pylist(), [1, 2, 1])
+        export_file.close()
+    
+    @patch('reports.services.report_service.NodeApiClient')
+    def test_export_reports_command(self, mock_api_client_class):
+        """Test export_reports command writes one file per dataset"""
+        mock_api_client_class.return_value = self.mock_client
+        self.mock_client.iter_video_pages.side_effect = lambda **kwargs: iter([
+            [{'id': 1, 'title': 'Video 1', 'category': 'Education', 'userId': 1, 'duration': 60}],
+        ])
+        
+        with tempfile.TemporaryDirectory() as output_dir:
+            stdout = io.StringIO()
+            call_command('export_reports', '--format', 'ndjson', '--output-dir', output_dir, stdout=stdout)
+            
+            videos = Path(output_dir, 'videos.ndjson').read_text().splitlines()
+            users = Path(output_dir, 'users.ndjson').read_text().splitlines()
+        
+        self.assertEqual(json.loads(videos[0])['id'], 1)
+        self.assertEqual(json.loads(users[0])['total_duration_seconds'], 60)
+        self.assertIn('Exported 1 videos rows', stdout.getvalue())
+
+
+class AggregationEngineTestCase(TestCase):
+    """Test cases for AggregationEngine"""
+    
+    def setUp(self):
+        corpus_cache.clear()
+        categories = ['Education', 'Technology', 'Music', 'Sports']
+        self.videos = [
+            {
+                'id': i,
+                'category': categories[(i * 7) % len(categories)],
+                'userId': (i * 13) % 37 + 1,
+                'duration': (i * 31) % 900 if i % 5 else None,
+            }
+            for i in range(1, 2001)
+        ]
+        # A nested user object first seen mid-corpus, in a later chunk
+        self.videos[1500] = {'id': 1501, 'category': 'Art', 'user': {'id': 99, 'name': 'Late User'}, 'duration': 10}
+    
+    def _start_upstream(self, page_size=100):
+        """Serve self.videos like the Node.js API, over real HTTP so worker processes can fetch it"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs, urlparse
+        corpus = self.videos
+        self.video_requests = requests_seen = []
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path.endswith('/videos'):
+                    query = parse_qs(url.query)
+                    requests_seen.append(query)
+                    page = int(query['page'][0])
+                    videos = corpus
+                    if 'category' in query:
+                        # Case-insensitive, like the Node.js API
+                        category = query['category'][0].casefold()
+                        videos = [video for video in corpus if video['category'].casefold() == category]
+                    data = {
+                        'videos': videos[(page - 1) * page_size:page * page_size],
+                        'pagination': {'page': page, 'totalPages': max(1, -(-len(videos) // page_size))},
+                    }
+                else:
+                    data = {'users': []}
+                body = json.dumps(data).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        
+        client = NodeApiClient()
+        client.base_url = f'http://127.0.0.1:{server.server_address[1]}/api'
+        return client
+    
+    def test_parallel_matches_serial(self):
+        """Test workers fetching their own page ranges give exactly the serial result"""
+        client = self._start_upstream()
+        self.addCleanup(shutdown_aggregation_pool)
+        engine = AggregationEngine(workers=2, pages_per_task=3, min_parallel_pages=0)
+        
+        serial = aggregate_chunk(self.videos)
+        parallel = engine.aggregate_corpus(client)
+        self.assertEqual(parallel, serial)
+        self.assertEqual(parallel['category_counts'].most_common(), serial['category_counts'].most_common())
+        self.assertEqual(list(parallel['users']), list(serial['users']))
+        self.assertEqual(parallel['users'][99]['user']['name'], 'Late User')
+        
+        # A category is pushed down, so only its pages are fetched
+        del self.video_requests[:]
+        self.assertEqual(engine.aggregate_corpus(client, category='music'), aggregate_chunk(self.videos, 'Music'))
+        self.assertEqual(len(self.video_requests), 5)
+        self.assertTrue(all(query['category'] == ['music'] for query in self.video_requests))
+        
+        # Below the page threshold everything stays in this process
+        with patch('reports.services.aggregation.get_aggregation_pool') as mock_get_pool:
+            small = AggregationEngine(workers=2, min_parallel_pages=100).aggregate_corpus(client)
+        self.assertEqual(small, serial)
+        mock_get_pool.assert_not_called()
+    
+    def test_reports_match_with_parallel_engine(self):
+        """Test summary and leaderboard reports are identical on the parallel path"""
+        client = self._start_upstream()
+        self.addCleanup(shutdown_aggregation_pool)
+        
+        def generate_reports():
+            corpus_cache.clear()
+            service = ReportService()
+            service.api_client = client
+            return (
+                service.generate_summary_report(),
+                service.generate_leaderboard_report(metric='duration', limit=20),
+            )
+        
+        serial_reports = generate_reports()
+        with override_settings(REPORT_AGGREGATION_WORKERS=2, REPORT_AGGREGATION_PAGES_PER_TASK=4,
+                               REPORT_AGGREGATION_MIN_PAGES=0):
+            parallel_reports = generate_reports()
+            # The corpus itself was never loaded into this process
+            self.assertFalse(corpus_cache.is_fresh())
+        
+        self.assertEqual(parallel_reports, serial_reports)
+    
+    def test_concurrent_cold_requests_share_one_build(self):
+        """Test concurrent requests for the same uncached aggregates start a single build"""
+        builds = []
+        release = threading.Event()
+        
+        def build():
+            builds.append(1)
+            release.wait(5)
+            return {'total_videos': 1}
+        
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(corpus_cache.get_standalone(('aggregates', None), build)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+        
+        self.assertEqual(len(builds), 1)
+        self.assertEqual(results, [{'total_videos': 1}] * 4)
+
+
+class ReportJobTestCase(TestCase):
+    """Test cases for async report jobs"""
+    
+    def setUp(self):
+        corpus_cache.clear()
+        self.job_service = ReportJobService()
+    
+    @patch('reports.services.job_service.get_job_executor')
+    def test_identical_jobs_are_deduplicated(self, mock_get_executor):
+        """Test concurrent identical requests share one job and one dispatch"""
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            job, created = self.job_service.submit('leaderboard', {'metric': 'duration', 'limit': '5'})
+            same_job, same_created = self.job_service.submit('leaderboard', {'limit': 5, 'metric': 'duration'})
+        
+        self.assertTrue(created)
+        self.assertFalse(same_created)
+        self.assertEqual(same_job.pk, job.pk)
+        self.assertEqual(job.params, {'metric': 'duration', 'limit': 5})
+        self.assertEqual(len(callbacks), 1)
+        mock_get_executor.return_value.submit.assert_called_once()
+        
+        other_job, other_created = self.job_service.submit('leaderboard', {'metric': 'videos'})
+        self.assertTrue(other_created)
+        self.assertNotEqual(other_job.pk, job.pk)
+    
+    @patch('reports.services.job_service.get_job_executor')
+    @patch('reports.services.report_service.NodeApiClient')
+    def test_job_api_runs_report(self, mock_api_client_class, mock_get_executor):
+        """Test submitting a job over the API, running it and polling the result"""
+        mock_client = Mock(spec=NodeApiClient)
+        mock_api_client_class.return_value = mock_client
+        mock_client.get_videos.return_value = [
+            {'id': 1, 'title': 'Video 1', 'category': 'Education', 'userId': 1, 'duration': 60},
+        ]
+        mock_client.get_user_by_id.return_value = {'id': 1, 'name': 'User 1', 'email': 'user1@example.com'}
+        
+        response = self.client.post(
+            '/api/report/jobs/',
+            {'report_type': 'user', 'params': {'user_id': 1}},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['status'], ReportJob.STATUS_PENDING)
+        job_id = response.json()['id']
+        
+        self.job_service.run(job_id)
+        
+        response = self.client.get(f'/api/report/jobs/{job_id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], ReportJob.STATUS_SUCCEEDED)
+        self.assertEqual(response.json()['result']['total_duration_seconds'], 60)
+        
+        # A finished job no longer absorbs new identical requests
+        job, created = self.job_service.submit('user', {'user_id': 1})
+        self.assertTrue(created)
+    
+    @patch('reports.services.job_service.get_job_executor')
+    def test_orphaned_jobs_are_recovered_on_poll(self, mock_get_executor):
+        """Test jobs left behind by a restarted process are re-dispatched or failed when polled"""
+        # Left by a previous process that had this same PID
+        pending = ReportJob.objects.create(report_type='summary', dedupe_key='a', worker=get_worker_id())
+        # Left by a process that no longer exists
+        dead_worker = f'{get_worker_id().rpartition(":")[0]}:999999999'
+        running = ReportJob.objects.create(
+            report_type='summary', dedupe_key='b', status=ReportJob.STATUS_RUNNING, worker=dead_worker
+        )
+        
+        response = self.client.get(f'/api/report/jobs/{pending.pk}/')
+        self.assertEqual(response.json()['status'], ReportJob.STATUS_PENDING)
+        mock_get_executor.return_value.submit.assert_called_once()
+        
+        response = self.client.get(f'/api/report/jobs/{running.pk}/')
+        self.assertEqual(response.json()['status'], ReportJob.STATUS_FAILED)
+        self.assertEqual(response.json()['error'], 'Job abandoned')
+        
+        # Jobs on other hosts are only failed once stale
+        remote = ReportJob.objects.create(report_type='summary', dedupe_key='c', worker='elsewhere:1')
+        self.assertEqual(self.job_service.get(remote.pk).status, ReportJob.STATUS_PENDING)
+        ReportJob.objects.filter(pk=remote.pk).update(created_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(self.job_service.get(remote.pk).status, ReportJob.STATUS_FAILED)
+        self.assertEqual(mock_get_executor.return_value.submit.call_count, 1)
+    
+    @patch('reports.services.job_service.get_job_executor')
+    def test_submit_joins_job_finished_during_race(self, mock_get_executor):
+        """Test losing the create race to a job that already finished returns that job"""
+        params = {'metric': 'videos'}
+        finished = ReportJob.objects.create(
+            report_type='leaderboard', params=params, status=ReportJob.STATUS_SUCCEEDED,
+            dedupe_key=self.job_service._dedupe_key('leaderboard', params),
+        )
+        
+        with patch.object(ReportJob.objects, 'create', side_effect=IntegrityError):
+            job, created = self.job_service.submit('leaderboard', params)
+        
+        self.assertFalse(created)
+        self.assertEqual(job.pk, finished.pk)
+    
+    def test_invalid_job_requests(self):
+        """Test unknown report types, missing params and invalid values are rejected"""
+        response = self.client.post(
+            '/api/report/jobs/',
+            {'report_type': 'everything'},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        
+        with self.assertRaises(ValueError):
+            self.job_service.submit('user', {})
+        
+        # Rejected at submit time, exactly like the synchronous endpoint
+        for params in ({'metric': 'likes'}, {'limit': 100000}, {'limit': 0},
+                       {'category': {'a': 1}}, {'limit': [5]}, {'limit': True}):
+            response = self.client.post(
+                '/api/report/jobs/',
+                {'report_type': 'leaderboard', 'params': params},
+                content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 400, params)
+        self.assertFalse(ReportJob.objects.exists())
+        
+        response = self.client.get('/api/report/jobs/00000000-0000-0000-0000-000000000000/')
+        self.assertEqual(response.status_code, 404)
+
+
+class StartupTestCase(TestCase):
+    """Test cases for the lean startup profile"""
+    
+    def test_measure_startup_api_profile(self):
+        """Test startup measurement under the API-only settings loads no HTTP client eagerly"""
+        stdout = io.StringIO()
+        with override_settings(SETTINGS_MODULE='reporting_service.settings_api'):
+            call_command('measure_startup', '--runs', '1', '--json', stdout=stdout)
+        
+        result = json.loads(stdout.getvalue())
+        self.assertEqual(result['settings'], 'reporting_service.settings_api')
+        self.assertEqual(result['status'], '200 OK')
+        self.assertGreater(result['import_ms'], 0)
+        self.assertGreater(result['first_request_ms'], 0)
+    
+    def test_http_clients_load_lazily(self):
+        """Test importing NodeApiClient does not import aiohttp"""
+        completed = subprocess.run(
+            [sys.executable, '-c',
+             'import sys; import reports.services.node_api_client; print("aiohttp" in sys.modules)'],
+            capture_output=True,
+            text=True,
+            env=dict(os.environ, DJANGO_SETTINGS_MODULE='reporting_service.settings_api'),
+            cwd=settings.BASE_DIR,
+        )
+        self.assertEqual(completed.stdout.strip(), 'False', completed.stderr)
+
+
+class ReportProfilingTestCase(TestCase):
+    """Test cases for on-demand request profiling"""
+    
+    def setUp(self):
+        corpus_cache.clear()
+        self.profile_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.profile_dir.cleanup)
+        settings_override = override_settings(
+            REPORT_PROFILING_TOKEN='secret',
+            REPORT_PROFILE_DIR=self.profile_dir.name,
+            REPORT_PROFILE_MAX_FILES=2,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+    
+    @patch('reports.services.report_service.NodeApiClient')
+    def test_profile_capture_and_download(self, mock_api_client_class):
+        """Test an allowed caller's request is captured and can be listed and downloaded"""
+        mock_client = Mock(spec=NodeApiClient)
+        mock_api_client_class.return_value = mock_client
+        mock_client.get_videos.return_value = [
+            {'id': 1, 'title': 'Video 1', 'category': 'Education', 'userId': 1, 'duration': 60},
+        ]
+        
+        response = self.client.get('/api/report/leaderboard/', HTTP_X_REPORT_PROFILE='secret')
+        self.assertEqual(response.status_code, 200)
+        name = response['X-Report-Profile-Id']
+        
+        response = self.client.get('/api/report/profiles/', HTTP_X_REPORT_PROFILE='secret')
+        self.assertEqual([capture['name'] for capture in response.json()['profiles']], [name])
+        
+        response = self.client.get(f'/api/report/profiles/{name}/', HTTP_X_REPORT_PROFILE='secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content))
+        
+        response = self.client.get(f'/api/report/profiles/{name}/summary/', HTTP_X_REPORT_PROFILE='secret')
+        self.assertIn('generate_leaderboard_report', response.content.decode())
+    
+    @patch('reports.services.report_service.NodeApiClient')
+    def test_streamed_export_profiled_while_read(self, mock_api_client_class):
+        """Test a streamed export's capture covers the body being generated"""
+        mock_api_client_class.return_value.iter_video_pages.side_effect = lambda **kwargs: iter([
+            [{'id': 1, 'title': 'Video 1', 'category': 'Education', 'userId': 1}],
+        ])
+        
+        response = self.client.get('/api/report/export/videos.csv', HTTP_X_REPORT_PROFILE='secret')
+        name = response['X-Report-Profile-Id']
+        # Nothing is saved until the response is closed
+        self.assertFalse((Path(self.profile_dir.name) / name).exists())
+        
+        b''.join(response.streaming_content)
+        summary = ProfileStore(self.profile_dir.name).summarize(name)
+        self.assertIn('_iter_video_batches', summary)
+    
+    @patch('reports.services.report_service.NodeApiClient')
+    def test_profiling_requires_token(self, mock_api_client_class):
+        """Test requests without the right token are served but not captured"""
+        mock_api_client_class.return_value.get_videos.return_value = []
+        
+        response = self.client.get('/api/report/leaderboard/', HTTP_X_REPORT_PROFILE='wrong')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Report-Profile-Id', response)
+        
+        response = self.client.get('/api/report/profiles/')
+        self.assertEqual(response.status_code, 403)
+        # The token is never accepted from the query string
+        response = self.client.get('/api/report/leaderboard/?profile=secret')
+        self.assertNotIn('X-Report-Profile-Id', response)
+        response = self.client.get('/api/report/profiles/?profile=secret')
+        self.assertEqual(response.status_code, 403)
+        
+        response = self.client.get('/api/report/profiles/../../settings.py/', HTTP_X_REPORT_PROFILE='secret')
+        self.assertEqual(response.status_code, 404)
+    
+    @patch('reports.services.report_service.NodeApiClient')
+    def test_profile_store_rotates(self, mock_api_client_class):
+        """Test only the newest REPORT_PROFILE_MAX_FILES captures are kept"""
+        mock_api_client_class.return_value.get_videos.return_value = []
+        
+        names = [
+            self.client.get('/api/report/leaderboard/', HTTP_X_REPORT_PROFILE='secret')['X-Report-Profile-Id']
+            for _ in range(3)
+        ]
+        
+        kept = sorted(path.name for path in Path(self.profile_dir.name).iterdir())
+        self.assertEqual(len(kept), 2)
+        self.assertNotIn(names[0], kept)
+    
+    @patch('reports.services.report_service.NodeApiClient')
+    def test_allowed_ips_restrict_token_holders(self, mock_api_client_class):
+        """Test the IP allowlist is an extra restriction on top of the token, never a substitute"""
+        mock_api_client_class.return_value.get_videos.return_value = []
+        
+        with override_settings(REPORT_PROFILING_ALLOWED_IPS=['127.0.0.1']):
+            response = self.client.get('/api/report/leaderboard/?profile=1')
+            self.assertNotIn('X-Report-Profile-Id', response)
+            self.assertEqual(self.client.get('/api/report/profiles/').status_code, 403)
+            
+            response = self.client.get('/api/report/leaderboard/?profile=1', HTTP_X_REPORT_PROFILE='secret')
+            self.assertIn('X-Report-Profile-Id', response)
+            
+            response = self.client.get('/api/report/leaderboard/', REMOTE_ADDR='10.0.0.9',
+                                       HTTP_X_REPORT_PROFILE='secret')
+            self.assertNotIn('X-Report-Profile-Id', response)
+        
+        # Non-ASCII tokens are refused, not a server error
+        response = self.client.get('/api/report/leaderboard/', HTTP_X_REPORT_PROFILE='sécret')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Report-Profile-Id', response)
+
+
+class AdmissionControlTestCase(TestCase):
+    """Test cases for report admission control"""
+    
+    def setUp(self):
+        corpus_cache.clear()
+        admission_controller.reset()
+        self.addCleanup(admission_controller.reset)
+    
+    def test_limiter_queue_and_shed(self):
+        """Test the limiter admits up to its limit, queues up to its bound and sheds the rest"""
+        limiter = AdmissionLimiter(max_concurrency=1, max_queue=1, queue_timeout=5)
+        self.assertTrue(limiter.acquire())
+        
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(limiter.acquire()))
+        waiter.start()
+        while limiter.snapshot()['queue_depth'] < 1:
+            time.sleep(0.001)
+        
+        # Queue is full: shed immediately
+        self.assertFalse(limiter.acquire())
+        
+        limiter.release()
+        waiter.join(timeout=5)
+        self.assertEqual(results, [True])
+        
+        snapshot = limiter.snapshot()
+        self.assertEqual(snapshot['in_flight'], 1)
+        self.assertEqual(snapshot['admitted'], 2)
+        self.assertEqual(snapshot['shed'], 1)
+        
+        # Waiting past the queue timeout also sheds
+        limiter.queue_timeout = 0.01
+        self.assertFalse(limiter.acquire())
+        self.assertEqual(limiter.snapshot()['timed_out'], 1)
+    
+    def test_limiter_bypass_when_cached(self):
+        """Test a queued request leaves the queue once it can be served from cache"""
+        limiter = AdmissionLimiter(max_concurrency=1, max_queue=1, queue_timeout=5)
+        limiter.acquire()
+        
+        self.assertIsNone(limiter.acquire(bypass=lambda: True))
+        self.assertEqual(limiter.snapshot()['bypassed'], 1)
+        
+        # Caching by another endpoint never releases this limiter; waiters notice anyway
+        cached = threading.Event()
+        threading.Timer(0.1, cached.set).start()
+        started = time.monotonic()
+        self.assertIsNone(limiter.acquire(bypass=cached.is_set))
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(limiter.snapshot()['bypassed'], 2)
+    
+    @override_settings(REPORT_ADMISSION_MAX_CONCURRENCY=1, REPORT_ADMISSION_MAX_QUEUE=0,
+                       REPORT_ADMISSION_RETRY_AFTER=7)
+    @patch('reports.services.report_service.NodeApiClient')
+    def test_shed_with_retry_after_unless_cached(self, mock_api_client_class):
+        """Test saturated endpoints return 503 for upstream-bound requests but serve cached ones"""
+        mock_api_client_class.return_value.get_videos.return_value = [
+            {'id': 1, 'title': 'Video 1', 'category': 'Education', 'userId': 1, 'duration': 60},
+        ]
+        # Another request is holding the only leaderboard slot
+        limiter = admission_controller.get_limiter('leaderboard')
+        limiter.acquire()
+        
+        response = self.client.get('/api/report/leaderboard/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '7')
+        
+        # Other endpoints have their own limit
+        response = self.client.get('/api/report/summary/')
+        self.assertEqual(response.status_code, 200)
+        
+        # The summary warmed the corpus cache, so the leaderboard no longer needs a slot
+        response = self.client.get('/api/report/leaderboard/')
+        self.assertEqual(response.status_code, 200)
+        limiter.release()
+        
+        metrics = self.client.get('/api/report/metrics/').json()
+        self.assertEqual(metrics['endpoints']['leaderboard']['shed'], 1)
+        self.assertEqual(metrics['endpoints']['leaderboard']['queue_depth'], 0)
+        self.assertEqual(metrics['endpoints']['summary']['admitted'], 1)
+        self.assertEqual(metrics['shed_total'], 1)
+        self.assertGreaterEqual(metrics['fast_lane_admitted'], 1)
+    
+    @override_settings(REPORT_ADMISSION_MAX_CONCURRENCY=1, REPORT_ADMISSION_MAX_QUEUE=0)
+    @patch('reports.services.report_service.NodeApiClient')
+    def test_fast_lane_requires_route_data_cached(self, mock_api_client_class):
+        """Test the fast lane checks the data each route needs, not just the corpus"""
+        mock_client = mock_api_client_class.return_value
+        mock_client.get_users.return_value = [{'id': 1}, {'id': 2}]
+        for endpoint in ('summary', 'leaderboard'):
+            admission_controller.get_limiter(endpoint).acquire()
+        
+        # A cached corpus is not enough: the unscoped summary still counts users upstream
+        corpus_cache.get_videos(lambda: [{'id': 1, 'category': 'Education', 'userId': 1}])
+        self.assertEqual(self.client.get('/api/report/summary/').status_code, 503)
+        
+        corpus_cache.get_standalone('total_users', lambda: 2)
+        response = self.client.get('/api/report/summary/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_users'], 2)
+        mock_client.get_users.assert_not_called()
+        
+        # Aggregates precomputed by aggregation workers count as cached without a corpus
+        corpus_cache.clear()
+        self.assertEqual(self.client.get('/api/report/leaderboard/?category=Music').status_code, 503)
+        corpus_cache.get_standalone(('aggregates', 'Music'), lambda: {'users': {}})
+        self.assertEqual(self.client.get('/api/report/leaderboard/?category=Music').status_code, 200)
+        mock_client.get_videos.assert_not_called()
+    
+    @override_settings(REPORT_ADMISSION_MAX_CONCURRENCY=1)
+    @patch('reports.services.report_service.NodeApiClient')
+    def test_streamed_export_holds_slot_until_consumed(self, mock_api_client_class):
+        """Test a streamed export releases its slot only once the body is consumed"""
+        mock_api_client_class.return_value.iter_video_pages.return_value = iter([
+            [{'id': 1, 'title': 'Video 1', 'category': 'Education', 'userId': 1}],
+        ])
+        
+        response = self.client.get('/api/report/export/videos.csv')
+        limiter = admission_controller.get_limiter('export')
+        self.assertEqual(limiter.snapshot()['in_flight'], 1)
+        
+        b''.join(response.streaming_content)
+        self.assertEqual(limiter.snapshot()['in_flight'], 0)
+    
+    @override_settings(REPORT_ADMISSION_MAX_CONCURRENCY=1)
+    @patch('reports.services.report_service.NodeApiClient')
+    def test_unread_export_releases_slot_on_close(self, mock_api_client_class):
+        """Test HEAD and closed-but-unread exports give their slot back"""
+        mock_api_client_class.return_value.iter_video_pages.side_effect = lambda **kwargs: iter([])
+        limiter = admission_controller.get_limiter('export')
+        
+        response = self.client.head('/api/report/export/videos.csv')
+        self.assertEqual(limiter.snapshot()['in_flight'], 1)
+        response.close()
+        self.assertEqual(limiter.snapshot()['in_flight'], 0)
+        
+        response = self.client.get('/api/report/export/videos.csv')
+        response.close()
+        self.assertEqual(limiter.snapshot()['in_flight'], 0)
+        
+        # Releasing a slot twice must not free another request's slot
+        limiter = AdmissionLimiter(max_concurrency=2, max_queue=0, queue_timeout=1)
+        limiter.acquire()
+        limiter.acquire()
+        slot = AdmissionSlot(limiter)
+        slot.release()
+        slot.release()
+        self.assertEqual(limiter.snapshot()['in_flight'], 1)
+    
+    @patch('reports.services.report_service.NodeApiClient')
+    def test_limiters_keyed_by_route(self, mock_api_client_class):
+        """Test path parameters share their route's limiter and unknown paths add none"""
+        mock_api_client_class.return_value.get_videos.return_value = []
+        mock_api_client_class.return_value.get_user_by_id.return_value = {'id': 1, 'name': 'User 1'}
+        
+        for path in ('/api/report/1/user/', '/api/report/2/user/', '/api/report/user/3/',
+                     '/api/report/nope1/', '/api/report/nope2/', '/api/report/zzz'):
+            corpus_cache.clear()
+            self.client.get(path)
+        
+        self.assertEqual(list(admission_controller.snapshot()['endpoints']), ['user'])
+        self.assertEqual(admission_controller.get_limiter('user').snapshot()['admitted'], 3)
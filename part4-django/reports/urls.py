@@ -1,6 +1,17 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ReportViewSet, SummaryReportView, UserActivityReportView
+from .views import (
+    AdmissionMetricsView,
+    ExportView,
+    LeaderboardReportView,
+    ProfileDetailView,
+    ProfileListView,
+    ReportJobDetailView,
+    ReportJobListView,
+    ReportViewSet,
+    SummaryReportView,
+    UserActivityReportView,
+)
 
 router = DefaultRouter()
 router.register(r'', ReportViewSet, basename='report')
@@ -8,6 +19,14 @@ router.register(r'', ReportViewSet, basename='report')
 urlpatterns = [
     path('summary/', SummaryReportView.as_view(), name='report-summary'),
     path('user/<int:user_id>/', UserActivityReportView.as_view(), name='report-user'),
+    path('leaderboard/', LeaderboardReportView.as_view(), name='report-leaderboard'),
+    path('export/<str:dataset>.<str:file_format>', ExportView.as_view(), name='report-export'),
+    path('jobs/', ReportJobListView.as_view(), name='report-job-list'),
+    path('jobs/<uuid:job_id>/', ReportJobDetailView.as_view(), name='report-job-detail'),
+    path('profiles/', ProfileListView.as_view(), name='report-profile-list'),
+    path('profiles/<str:name>/', ProfileDetailView.as_view(), name='report-profile-detail'),
+    path('profiles/<str:name>/summary/', ProfileDetailView.as_view(), {'summary': True}, name='report-profile-summary'),
+    path('metrics/', AdmissionMetricsView.as_view(), name='report-metrics'),
     path('', include(router.urls)),
 ]
 
@@ -1,9 +1,30 @@
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from .models import ReportJob
+from .services.admission import admission_controller
+from .services.export_service import ExportService
+from .services.job_service import ReportJobService
+from .services.profiling import ProfileStore, is_profiling_allowed
 from .services.report_service import ReportService
-from .serializers import SummaryReportSerializer, UserActivityReportSerializer
+from .serializers import (
+    LeaderboardReportSerializer,
+    ReportJobSerializer,
+    SummaryReportSerializer,
+    UserActivityReportSerializer,
+)
+
+
+def get_report_filters(request, allowed=('category', 'search', 'user_id')):
+    """Read report filter query parameters, raising ValueError on a bad user_id"""
+    filters = {}
+    for name in allowed:
+        value = request.query_params.get(name)
+        if value:
+            filters[name] = int(value) if name == 'user_id' else value
+    return filters
 
 
 class ReportViewSet(viewsets.ViewSet):
@@ -17,9 +38,15 @@ class ReportViewSet(viewsets.ViewSet):
     def summary(self, request):
         """Generate summary report"""
         try:
-            report_data = self.report_service.generate_summary_report()
+            filters = get_report_filters(request)
+            report_data = self.report_service.generate_summary_report(**filters)
             serializer = SummaryReportSerializer(report_data)
             return Response(serializer.data, status=status.HTTP_200_OK)
+        except ValueError:
+            return Response(
+                {'error': 'Invalid user ID'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         except Exception as e:
             return Response(
                 {'error': str(e)},
@@ -31,7 +58,8 @@ class ReportViewSet(viewsets.ViewSet):
         """Generate user activity report"""
         try:
             user_id = int(pk)
-            report_data = self.report_service.generate_user_activity_report(user_id)
+            filters = get_report_filters(request, allowed=('category', 'search'))
+            report_data = self.report_service.generate_user_activity_report(user_id, **filters)
             serializer = UserActivityReportSerializer(report_data)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except ValueError:
@@ -50,12 +78,18 @@ class SummaryReportView(APIView):
     """API View for summary report"""
     
     def get(self, request):
-        """GET /api/report/summary"""
+        """GET /api/report/summary?category=...&search=...&user_id=..."""
         try:
+            filters = get_report_filters(request)
             report_service = ReportService()
-            report_data = report_service.generate_summary_report()
+            report_data = report_service.generate_summary_report(**filters)
             serializer = SummaryReportSerializer(report_data)
             return Response(serializer.data, status=status.HTTP_200_OK)
+        except ValueError:
+            return Response(
+                {'error': 'Invalid user ID'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         except Exception as e:
             return Response(
                 {'error': str(e)},
@@ -67,11 +101,12 @@ class UserActivityReportView(APIView):
     """API View for user activity report"""
     
     def get(self, request, user_id):
-        """GET /api/report/user/<id>"""
+        """GET /api/report/user/<id>?category=...&search=..."""
         try:
             user_id_int = int(user_id)
+            filters = get_report_filters(request, allowed=('category', 'search'))
             report_service = ReportService()
-            report_data = report_service.generate_user_activity_report(user_id_int)
+            report_data = report_service.generate_user_activity_report(user_id_int, **filters)
             serializer = UserActivityReportSerializer(report_data)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except ValueError:
@@ -85,3 +120,187 @@ class UserActivityReportView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+
+class LeaderboardReportView(APIView):
+    """API View for top-N users leaderboard report"""
+    
+    def get(self, request):
+        """GET /api/report/leaderboard?metric=videos|duration&limit=10&category=..."""
+        try:
+            metric = request.query_params.get('metric', 'videos')
+            limit = int(request.query_params.get('limit', 10))
+            category = request.query_params.get('category') or None
+            report_service = ReportService()
+            report_data = report_service.generate_leaderboard_report(
+                metric=metric, limit=limit, category=category
+            )
+            serializer = LeaderboardReportSerializer(report_data)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except Exception as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class ExportView(APIView):
+    """API View for bulk export of the video corpus and per-user aggregates"""
+    
+    def get(self, request, dataset, file_format):
+        """GET /api/report/export/<videos|users>.<csv|ndjson|parquet|arrow>?category=...&search=..."""
+        try:
+            export_service = ExportService()
+            export_service.validate(dataset, file_format)
+            filters = get_report_filters(request, allowed=('category', 'search'))
+            content_type = ExportService.CONTENT_TYPES[file_format]
+            filename = f'{dataset}.{file_format}'
+            
+            if file_format in ExportService.TEXT_FORMATS:
+                response = StreamingHttpResponse(
+                    export_service.stream_text(dataset, file_format, **filters),
+                    content_type=content_type
+                )
+                response['Content-Disposition'] = f'attachment; filename="{filename}"'
+                return response
+            
+            return FileResponse(
+                export_service.open_file(dataset, file_format, **filters),
+                as_attachment=True,
+                filename=filename,
+                content_type=content_type
+            )
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except ImportError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+        except Exception as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class ReportJobListView(APIView):
+    """API View for submitting async report jobs"""
+    
+    def post(self, request):
+        """POST /api/report/jobs/ {"report_type": "...", "params": {...}}"""
+        try:
+            job, created = ReportJobService().submit(
+                request.data.get('report_type'),
+                request.data.get('params') or {}
+            )
+            data = dict(ReportJobSerializer(job).data)
+            # False when an identical job was already pending or running
+            data['created'] = created
+            return Response(data, status=status.HTTP_202_ACCEPTED)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except Exception as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class ReportJobDetailView(APIView):
+    """API View for polling an async report job"""
+    
+    def get(self, request, job_id):
+        """GET /api/report/jobs/<id>"""
+        try:
+            job = ReportJobService().get(job_id)
+            serializer = ReportJobSerializer(job)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        except ReportJob.DoesNotExist:
+            return Response(
+                {'error': f'Job {job_id} not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        except Exception as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class ProfileAccessMixin:
+    """Restrict profile capture endpoints to callers holding the profiling token"""
+    
+    def check_profile_access(self, request):
+        """Return an error response when the caller may not access captures"""
+        if not is_profiling_allowed(request):
+            return Response(
+                {'error': 'Profiling access denied'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return None
+
+
+class ProfileListView(ProfileAccessMixin, APIView):
+    """API View for listing per-request profile captures"""
+    
+    def get(self, request):
+        """GET /api/report/profiles"""
+        denied = self.check_profile_access(request)
+        if denied:
+            return denied
+        try:
+            return Response({'profiles': ProfileStore().list()}, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class ProfileDetailView(ProfileAccessMixin, APIView):
+    """API View for downloading a profile capture or reading its summary"""
+    
+    def get(self, request, name, summary=False):
+        """GET /api/report/profiles/<name> (pstats dump) or /api/report/profiles/<name>/summary (text)"""
+        denied = self.check_profile_access(request)
+        if denied:
+            return denied
+        try:
+            store = ProfileStore()
+            if summary:
+                return HttpResponse(store.summarize(name), content_type='text/plain; charset=utf-8')
+            return FileResponse(
+                open(store.get_path(name), 'rb'),
+                as_attachment=True,
+                filename=name,
+                content_type='application/octet-stream'
+            )
+        except FileNotFoundError:
+            return Response(
+                {'error': f'Profile {name} not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        except Exception as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class AdmissionMetricsView(APIView):
+    """API View for admission control metrics"""
+    
+    def get(self, request):
+        """GET /api/report/metrics"""
+        return Response(admission_controller.snapshot(), status=status.HTTP_200_OK)